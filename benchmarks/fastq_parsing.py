@@ -0,0 +1,180 @@
+"""Compare FASTQ parsing throughput against the original line-by-line parser.
+
+Run from the repository root::
+
+    python benchmarks/fastq_parsing.py [path] [--reads N] [--length L]
+
+A synthetic FASTQ file is generated in a temporary directory when no path is given.
+Each benchmark reports the best of ``--repeat`` runs in reads per second.
+
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from virtool_core.bio import (  # noqa: E402
+    count_fastq_records,
+    iter_fastq,
+    iter_fastq_headers,
+    read_fastq_batches_from_path,
+    read_fastq_from_path,
+    read_fastq_headers,
+)
+
+
+def write_fastq(path: Path, reads: int, length: int):
+    """Write ``reads`` random records with sequences of ``length`` bases to `path`."""
+    rng = random.Random(0)
+    quality = "I" * length
+
+    with open(path, "w") as f:
+        for index in range(reads):
+            sequence = "".join(rng.choices("ACGT", k=length))
+            f.write(f"@read_{index} 1:N:0:1\n{sequence}\n+\n{quality}\n")
+
+
+def iter_fastq_line_by_line(path: Path):
+    """The loop used by the original :func:`read_fastq_from_path`."""
+    had_plus = False
+    header = None
+    seq = None
+
+    with open(path) as f:
+        for line in f:
+            if line == "+\n":
+                had_plus = True
+                continue
+
+            if not had_plus:
+                if line[0] == "@":
+                    header = line.rstrip()
+                    continue
+
+                seq = line.rstrip()
+                continue
+
+            yield header, seq, line.rstrip()
+
+            header = None
+            seq = None
+            had_plus = False
+
+
+async def read_fastq_line_by_line(path: Path):
+    """The original :func:`read_fastq_from_path`, with one queue item per record."""
+    q: asyncio.Queue = asyncio.Queue()
+
+    def func():
+        for record in iter_fastq_line_by_line(path):
+            q.put_nowait(record)
+
+        q.put_nowait(None)
+
+    task = asyncio.create_task(asyncio.to_thread(func))
+
+    while True:
+        item = await q.get()
+
+        if item is None:
+            break
+
+        yield item
+
+    await task
+
+
+async def consume(iterable) -> int:
+    count = 0
+
+    async for _ in iterable:
+        count += 1
+
+    return count
+
+
+async def consume_batches(path: Path) -> int:
+    count = 0
+
+    async for batch in read_fastq_batches_from_path(path):
+        count += len(batch)
+
+    return count
+
+
+def measure(func: Callable[[], int], repeat: int) -> tuple[int, float]:
+    """Return the result of `func` and its fastest run time in seconds."""
+    best = float("inf")
+    result = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+
+def run(path: Path, repeat: int):
+    benchmarks = {
+        "original read_fastq_from_path": lambda: asyncio.run(
+            consume(read_fastq_line_by_line(path)),
+        ),
+        "original loop (no queue)": lambda: sum(
+            1 for _ in iter_fastq_line_by_line(path)
+        ),
+        "read_fastq_from_path": lambda: asyncio.run(
+            consume(read_fastq_from_path(path)),
+        ),
+        "read_fastq_batches_from_path": lambda: asyncio.run(consume_batches(path)),
+        "iter_fastq": lambda: sum(1 for _ in iter_fastq(path)),
+        "iter_fastq (sequences only)": lambda: sum(
+            1 for _ in iter_fastq(path, header=False, quality=False)
+        ),
+        "iter_fastq_headers": lambda: sum(1 for _ in iter_fastq_headers(path)),
+        "read_fastq_headers": lambda: len(asyncio.run(read_fastq_headers(path))),
+        "count_fastq_records": lambda: count_fastq_records(path),
+    }
+
+    baseline = None
+
+    print(f"{path} ({path.stat().st_size / 1024**2:.1f} MiB)")
+    print(f"{'benchmark':34s}{'seconds':>10s}{'reads/s':>14s}{'speedup':>10s}")
+
+    for name, func in benchmarks.items():
+        reads, seconds = measure(func, repeat)
+        rate = reads / seconds
+
+        if baseline is None:
+            baseline = rate
+
+        print(f"{name:34s}{seconds:10.3f}{rate:14,.0f}{rate / baseline:9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", type=Path)
+    parser.add_argument("--reads", type=int, default=500_000)
+    parser.add_argument("--length", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.path:
+        run(args.path, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "reads.fq"
+        write_fastq(path, args.reads, args.length)
+        run(path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
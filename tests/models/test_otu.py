@@ -1,3 +1,6 @@
+import pytest
+from pydantic import ValidationError
+
 from virtool_core.models.otu import OTUSegment, OTUSequence
 
 
@@ -20,3 +23,17 @@ def test_host_nullable():
     assert OTUSequence(**sequence).host == ""
 
     assert OTUSequence(**{**sequence, "host": "test_host"}).host == "test_host"
+
+
+def test_sequence_alphabet():
+    sequence = {
+        "accession": "test_accession",
+        "definition": "test_definition",
+        "id": "test_id",
+        "sequence": "ACGTRYKMN",
+    }
+
+    assert OTUSequence(**sequence).sequence == "ACGTRYKMN"
+
+    with pytest.raises(ValidationError, match="The format of the sequence is invalid"):
+        OTUSequence(**{**sequence, "sequence": "ACGT*"})
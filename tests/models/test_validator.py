@@ -2,7 +2,11 @@ import pytest
 from pydantic import ValidationError
 
 from virtool_core.models.basemodel import BaseModel
-from virtool_core.models.validators import prevent_none
+from virtool_core.models.validators import (
+    IUPAC_NUCLEOTIDES,
+    check_sequence,
+    prevent_none,
+)
 
 
 class DummyModel(BaseModel):
@@ -34,3 +38,23 @@ def test_prevent_null_validator():
         DummyModel(name="baz_1", id=None, count=None)
 
     assert "Value may not be null" in str(err)
+
+
+@pytest.mark.parametrize(
+    "sequence,alphabet,valid",
+    [
+        ("", "ACGTN", True),
+        ("ACGTN", "ACGTN", True),
+        ("acgtn", "ACGTN", True),
+        ("ACGTR", "ACGTN", False),
+        ("ACGTR", IUPAC_NUCLEOTIDES, True),
+        ("ACGT-", IUPAC_NUCLEOTIDES, False),
+        ("ACGTé", IUPAC_NUCLEOTIDES, False),
+    ],
+)
+def test_check_sequence(sequence: str, alphabet: str, valid: bool):
+    if valid:
+        assert check_sequence(sequence, alphabet) == sequence
+    else:
+        with pytest.raises(ValueError, match="The format of the sequence is invalid"):
+            check_sequence(sequence, alphabet)
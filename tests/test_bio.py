@@ -1,15 +1,38 @@
+import bz2
+import gzip
+import json
+import operator
 import os
 import pickle
 import sys
+from contextlib import aclosing
 from pathlib import Path
 
 import pytest
+from pydantic import BaseModel
 
 import virtool_core.bio
+import virtool_core.utils
+from virtool_core.models.subtraction import NucleotideComposition
 
 TEST_FILES_PATH = Path(sys.path[0]) / "tests" / "test_files"
 TEST_BIO_PATH = TEST_FILES_PATH / "bio"
 
+FASTQ = (
+    "@read_1\n"
+    "ATAGAGTACATATCTACTTC\n"
+    "+\n"
+    "#1=DDDFFHHHHHJJJJJJJ\n"
+    "@read_2\n"
+    "CCTCTGACTGAC\n"
+    "+read_2\n"
+    "#4=DFFFFHHHH\n"
+    "@read_3\n"
+    "NCTCGCGGTACTTGTTTGCTATCG\n"
+    "+\n"
+    "@4=DFFFFHHHHHJJJJJJJJJJJ\n"
+)
+
 
 @pytest.fixture()
 def orf_containing():
@@ -46,6 +69,119 @@ def test_read_fasta(illegal, tmpdir):
         ]
 
 
+@pytest.mark.parametrize("suffix", [".fa", ".fasta", ".fna"])
+@pytest.mark.parametrize("chunk_size", [1, 7, virtool_core.bio.FASTA_CHUNK_SIZE])
+def test_iter_fasta(suffix: str, chunk_size: int, tmp_path: Path):
+    """Test that records are parsed correctly regardless of how the file is chunked.
+
+    Trailing whitespace is stripped from every line and records with empty headers
+    and no sequence are skipped.
+    """
+    path = tmp_path / f"test{suffix}"
+    path.write_text(
+        ">test_1 a>b\nATAGAGTA  \nCATA\t\r\n>test_2\n\nCCTC\n> \n>test_3\n",
+    )
+
+    assert list(virtool_core.bio.iter_fasta(path, chunk_size=chunk_size)) == [
+        ("test_1 ab", "ATAGAGTACATA"),
+        ("test_2", "CCTC"),
+        ("test_3", ""),
+    ]
+
+
+def test_iter_fasta_empty_header(tmp_path: Path):
+    path = tmp_path / "test.fa"
+    path.write_text(">test_1\nACGT\n>\nAC\n")
+
+    with pytest.raises(OSError, match="Illegal FASTA line: AC"):
+        list(virtool_core.bio.iter_fasta(path))
+
+
+def test_iter_fasta_invalid_suffix(tmp_path: Path):
+    path = tmp_path / "test.txt"
+    path.write_text(">test_1\nATAGAGTA\n")
+
+    with pytest.raises(OSError, match="Invalid FASTA file"):
+        list(virtool_core.bio.iter_fasta(path))
+
+
+async def test_read_fasta_from_path(tmp_path: Path):
+    path = tmp_path / "test.fa"
+    path.write_text(">test_1\nATAGAGTA\nCATA\n>test_2\nCCTC\n")
+
+    assert [
+        record async for record in virtool_core.bio.read_fasta_from_path(path)
+    ] == [("test_1", "ATAGAGTACATA"), ("test_2", "CCTC")]
+
+
+def test_read_fasta_compressed(tmp_path: Path):
+    path = tmp_path / "test.fa.gz"
+    path.write_bytes(gzip.compress(b">test_1\nATAGAGTACA\nTATCTACTTC\n>test_2\nCCTC\n"))
+
+    assert virtool_core.bio.read_fasta(path) == [
+        ("test_1", "ATAGAGTACATATCTACTTC"),
+        ("test_2", "CCTC"),
+    ]
+
+
+class TestFastaIndex:
+    @pytest.fixture()
+    def fasta_path(self, tmp_path: Path) -> Path:
+        path = tmp_path / "reference.fa"
+        path.write_text(
+            ">seq_1 first sequence\nATAGAGTACA\nTATCTACTTC\nTAT\n"
+            ">seq_2\nCCTCTGACTG\nACTATGGGCT\n"
+            ">seq_3\n",
+        )
+
+        return path
+
+    def test_build(self, fasta_path: Path):
+        """Test that a samtools-compatible index is written next to the FASTA file."""
+        with virtool_core.bio.FastaIndex(fasta_path) as index:
+            assert len(index) == 3
+            assert "seq_2" in index
+
+        assert (fasta_path.parent / "reference.fa.fai").read_text() == (
+            "seq_1\t23\t22\t10\t11\n"
+            "seq_2\t20\t55\t10\t11\n"
+            "seq_3\t0\t84\t0\t0\n"
+        )
+
+    @pytest.mark.parametrize(
+        "name,start,end,expected",
+        [
+            ("seq_1", 0, None, "ATAGAGTACATATCTACTTCTAT"),
+            ("seq_1", 8, 12, "CATA"),
+            ("seq_1", 20, 100, "TAT"),
+            ("seq_2", 10, 20, "ACTATGGGCT"),
+            ("seq_2", 5, 5, ""),
+            ("seq_3", 0, None, ""),
+        ],
+    )
+    def test_fetch(
+        self,
+        name: str,
+        start: int,
+        end: int | None,
+        expected: str,
+        fasta_path: Path,
+    ):
+        with virtool_core.bio.FastaIndex(fasta_path) as index:
+            assert index.fetch(name, start, end) == expected
+
+        # Fetch again using the index loaded from disk.
+        with virtool_core.bio.FastaIndex(fasta_path) as index:
+            assert index.fetch(name, start, end) == expected
+
+    def test_inconsistent_lines(self, tmp_path: Path):
+        path = tmp_path / "reference.fa"
+        path.write_text(">seq_1\nATAGAGTACA\nTATCT\nTATCTACTTC\n")
+
+        with pytest.raises(OSError, match="Inconsistent line lengths"):
+            virtool_core.bio.FastaIndex(path)
+
+
 async def test_read_fastq_from_path(tmpdir):
     tmpfile = tmpdir.join("test.fa")
 
@@ -83,6 +219,451 @@ async def test_read_fastq_from_path(tmpdir):
     ]
 
 
+@pytest.mark.parametrize("chunk_size", [5, 64, virtool_core.bio.FASTQ_CHUNK_SIZE])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_iter_fastq(chunk_size: int, newline: str, tmpdir):
+    """Test that records are parsed correctly regardless of how the file is chunked and
+    which line endings are used.
+    """
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write_binary(FASTQ.replace("\n", newline).encode())
+
+    assert list(virtool_core.bio.iter_fastq(tmpfile, chunk_size=chunk_size)) == [
+        ("@read_1", "ATAGAGTACATATCTACTTC", "#1=DDDFFHHHHHJJJJJJJ"),
+        ("@read_2", "CCTCTGACTGAC", "#4=DFFFFHHHH"),
+        ("@read_3", "NCTCGCGGTACTTGTTTGCTATCG", "@4=DFFFFHHHHHJJJJJJJJJJJ"),
+    ]
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress])
+def test_iter_fastq_compressed(compress, tmp_path: Path):
+    path = tmp_path / "test.fq.gz"
+    path.write_bytes(compress(FASTQ.encode()))
+
+    assert [record[0] for record in virtool_core.bio.iter_fastq(path)] == [
+        "@read_1",
+        "@read_2",
+        "@read_3",
+    ]
+
+
+@pytest.mark.parametrize("header", [True, False])
+@pytest.mark.parametrize("sequence", [True, False])
+@pytest.mark.parametrize("quality", [True, False])
+def test_iter_fastq_fields(header: bool, sequence: bool, quality: bool, tmpdir):
+    """Test that fields that are not requested are returned as ``None``."""
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write(FASTQ.rstrip())
+
+    records = [
+        ("@read_1", "ATAGAGTACATATCTACTTC", "#1=DDDFFHHHHHJJJJJJJ"),
+        ("@read_2", "CCTCTGACTGAC", "#4=DFFFFHHHH"),
+        ("@read_3", "NCTCGCGGTACTTGTTTGCTATCG", "@4=DFFFFHHHHHJJJJJJJJJJJ"),
+    ]
+
+    assert list(
+        virtool_core.bio.iter_fastq(
+            tmpfile,
+            header=header,
+            sequence=sequence,
+            quality=quality,
+        ),
+    ) == [
+        (
+            record[0] if header else None,
+            record[1] if sequence else None,
+            record[2] if quality else None,
+        )
+        for record in records
+    ]
+
+
+@pytest.mark.parametrize(
+    "content,message",
+    [
+        (FASTQ[:-26], "Truncated FASTQ record"),
+        (FASTQ.replace("+read_2", "read_2"), "Invalid FASTQ record"),
+        (FASTQ.replace("#4=DFFFFHHHH", "#4=DFF"), "Invalid FASTQ record"),
+    ],
+    ids=["truncated", "no_separator", "short_quality"],
+)
+def test_iter_fastq_error(content: str, message: str, tmpdir):
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write(content)
+
+    with pytest.raises(OSError, match=message):
+        list(virtool_core.bio.iter_fastq(tmpfile))
+
+
+@pytest.mark.parametrize(
+    "batch_size,expected",
+    [(2, [2, 1]), (3, [3]), (1000, [3])],
+)
+async def test_read_fastq_batches_from_path(
+    batch_size: int,
+    expected: list[int],
+    tmpdir,
+):
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write(FASTQ)
+
+    batches = [
+        batch
+        async for batch in virtool_core.bio.read_fastq_batches_from_path(
+            tmpfile,
+            batch_size=batch_size,
+        )
+    ]
+
+    assert [len(batch) for batch in batches] == expected
+    assert [record for batch in batches for record in batch] == list(
+        virtool_core.bio.iter_fastq(tmpfile),
+    )
+
+
+async def test_read_fastq_batches_from_path_early_exit(tmpdir):
+    """Test that a reader thread blocked on a full queue stops when the consumer
+    stops reading.
+    """
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write(FASTQ * 100)
+
+    async with aclosing(
+        virtool_core.bio.read_fastq_batches_from_path(
+            tmpfile,
+            batch_size=1,
+            max_batches=1,
+        ),
+    ) as batches:
+        async for batch in batches:
+            assert batch[0][0] == "@read_1"
+            break
+
+
+async def test_read_fastq_batches_from_path_error(tmpdir):
+    """Test that parsing errors in the reader thread are raised in the consumer."""
+    tmpfile = tmpdir.join("test.fq")
+    tmpfile.write(FASTQ.replace("+read_2", "read_2"))
+
+    with pytest.raises(OSError, match="Invalid FASTQ record"):
+        async for _ in virtool_core.bio.read_fastq_batches_from_path(tmpfile):
+            pass
+
+
+def test_format_fastq(tmp_path: Path):
+    """Test that records read from a FASTQ file can be formatted and compressed back
+    to an equivalent file in one pass.
+    """
+    path = tmp_path / "test.fq"
+    path.write_text(FASTQ)
+
+    with open(tmp_path / "out.fq.gz", "wb") as f:
+        for chunk in virtool_core.utils.compress_chunks(
+            virtool_core.bio.format_fastq(
+                virtool_core.bio.iter_fastq(path),
+                batch_size=2,
+            ),
+        ):
+            f.write(chunk)
+
+    assert gzip.decompress((tmp_path / "out.fq.gz").read_bytes()).decode() == (
+        FASTQ.replace("+read_2", "+")
+    )
+    assert list(virtool_core.bio.iter_fastq(tmp_path / "out.fq.gz")) == list(
+        virtool_core.bio.iter_fastq(path),
+    )
+
+
+def test_format_fasta():
+    records = [("seq_1 description", "ACGT"), ("seq_2", "GG")]
+
+    assert b"".join(virtool_core.bio.format_fasta(records, batch_size=1)) == (
+        b">seq_1 description\nACGT\n>seq_2\nGG\n"
+    )
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_iter_fastq_headers(newline: str, tmp_path: Path):
+    path = tmp_path / "test.fq.gz"
+    path.write_bytes(gzip.compress((FASTQ * 2).replace("\n", newline).encode()))
+
+    assert list(virtool_core.bio.iter_fastq_headers(path)) == [
+        "@read_1",
+        "@read_2",
+        "@read_3",
+    ] * 2
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_iter_fastq_headers_validate(validate: bool, tmp_path: Path):
+    """Test that malformed records are only rejected when ``validate`` is set, but
+    truncated files are always rejected.
+    """
+    path = tmp_path / "test.fq"
+    path.write_text(FASTQ.replace("#4=DFFFFHHHH", "#4=DFF"))
+
+    if validate:
+        with pytest.raises(OSError, match="Invalid FASTQ record"):
+            list(virtool_core.bio.iter_fastq_headers(path, validate=True))
+    else:
+        assert list(virtool_core.bio.iter_fastq_headers(path)) == [
+            "@read_1",
+            "@read_2",
+            "@read_3",
+        ]
+
+    path.write_text(FASTQ[:-26])
+
+    with pytest.raises(OSError, match="Truncated FASTQ record"):
+        list(virtool_core.bio.iter_fastq_headers(path, validate=validate))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_map_reduce_fastq_validate(processes: int, tmp_path: Path):
+    path = tmp_path / "test.fq"
+    path.write_text(FASTQ.replace("#4=DFFFFHHHH", "#4=DFF") * 20)
+
+    with pytest.raises(OSError, match="Invalid FASTQ record"):
+        virtool_core.bio.map_reduce_fastq(
+            path,
+            virtool_core.bio._collect_fastq_headers,
+            operator.iadd,
+            processes=processes,
+            min_shard_size=1,
+            binary=True,
+        )
+
+    assert virtool_core.bio.map_reduce_fastq(
+        path,
+        virtool_core.bio._collect_fastq_headers,
+        operator.iadd,
+        processes=processes,
+        min_shard_size=1,
+        binary=True,
+        validate=False,
+    ) == ["@read_1", "@read_2", "@read_3"] * 20
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (FASTQ, 3),
+        (FASTQ.rstrip("\n"), 3),
+        (FASTQ + "\n\n", 3),
+        (FASTQ.replace("\n", "\r\n"), 3),
+        (FASTQ * 1000, 3000),
+        ("", 0),
+        ("@a\nACG\n+\nIII\n@b\n\n+\n\n", 2),
+        ("@a\nACG\n+\nIII\n@b\n\n+\n", 2),
+    ],
+    ids=[
+        "ok",
+        "no_final_newline",
+        "blank_lines",
+        "crlf",
+        "large",
+        "empty",
+        "empty_read",
+        "empty_read_no_final_newline",
+    ],
+)
+def test_count_fastq_records(content: str, expected: int, tmp_path: Path):
+    """Test that records are counted the same way :func:`iter_fastq` reads them."""
+    path = tmp_path / "test.fq"
+    path.write_text(content)
+
+    assert virtool_core.bio.count_fastq_records(path) == expected
+    assert len(list(virtool_core.bio.iter_fastq(path))) == expected
+
+
+def test_count_fastq_records_truncated(tmp_path: Path):
+    path = tmp_path / "test.fq"
+    path.write_text(FASTQ.rsplit("\n", 2)[0])
+
+    with pytest.raises(OSError, match="Truncated FASTQ record"):
+        virtool_core.bio.count_fastq_records(path)
+
+
+class TestReadPairedFastqBatchesFromPath:
+    @pytest.fixture()
+    def paths(self, tmp_path: Path) -> tuple[Path, Path]:
+        path_1 = tmp_path / "reads_1.fq"
+        path_2 = tmp_path / "reads_2.fq.gz"
+
+        path_1.write_text(
+            FASTQ.replace("@read_1", "@read_1/1").replace(
+                "@read_2",
+                "@read_2 1:N:0:1",
+            ),
+        )
+        path_2.write_bytes(
+            gzip.compress(
+                FASTQ.replace("@read_1", "@read_1/2")
+                .replace("@read_2", "@read_2 2:N:0:1")
+                .encode(),
+            ),
+        )
+
+        return path_1, path_2
+
+    async def test_ok(self, paths: tuple[Path, Path]):
+        batches = [
+            batch
+            async for batch in virtool_core.bio.read_paired_fastq_batches_from_path(
+                *paths,
+                batch_size=2,
+            )
+        ]
+
+        assert [(len(batch_1), len(batch_2)) for batch_1, batch_2 in batches] == [
+            (2, 2),
+            (1, 1),
+        ]
+        assert batches[0][0][1][0] == "@read_2 1:N:0:1"
+        assert batches[0][1][1][0] == "@read_2 2:N:0:1"
+
+    async def test_mismatch(self, paths: tuple[Path, Path]):
+        paths[0].write_text(FASTQ.replace("@read_2", "@read_4"))
+
+        with pytest.raises(
+            OSError,
+            match="Mate headers do not match: @read_4 and @read_2 2:N:0:1",
+        ):
+            async for _ in virtool_core.bio.read_paired_fastq_batches_from_path(
+                *paths,
+            ):
+                pass
+
+    @pytest.mark.parametrize("batch_size", [1, 1000])
+    async def test_different_lengths(self, batch_size: int, paths: tuple[Path, Path]):
+        paths[0].write_text(FASTQ + FASTQ)
+
+        with pytest.raises(OSError, match="different numbers of reads"):
+            async for _ in virtool_core.bio.read_paired_fastq_batches_from_path(
+                *paths,
+                batch_size=batch_size,
+            ):
+                pass
+
+    async def test_early_exit(self, paths: tuple[Path, Path]):
+        paths[0].write_text(FASTQ * 100)
+        paths[1].write_text(FASTQ * 100)
+
+        async with aclosing(
+            virtool_core.bio.read_paired_fastq_batches_from_path(
+                *paths,
+                batch_size=1,
+                max_batches=1,
+            ),
+        ) as batches:
+            async for batch_1, batch_2 in batches:
+                assert batch_1 == batch_2
+                break
+
+
+class TestReadBatch:
+    @pytest.fixture()
+    def path(self, tmp_path: Path) -> Path:
+        path = tmp_path / "test.fq"
+        path.write_text(FASTQ.replace("CCTCTGACTGAC", "cctctgactgac"))
+        return path
+
+    def test_iter_fastq_read_batches(self, path: Path):
+        batches = list(virtool_core.bio.iter_fastq_read_batches(path, batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert [record for batch in batches for record in batch] == [
+            record
+            for batch in virtool_core.bio.iter_fastq_batches(path)
+            for record in batch
+        ]
+
+        batch = batches[0]
+
+        assert batch.headers == ["@read_1", "@read_2"]
+        assert batch.sequences == b"ATAGAGTACATATCTACTTCcctctgactgac"
+        assert batch.qualities == b"#1=DDDFFHHHHHJJJJJJJ#4=DFFFFHHHH"
+        assert list(batch.offsets) == [0, 20, 32]
+        assert batch[-1] == ("@read_2", "cctctgactgac", "#4=DFFFFHHHH")
+
+        with pytest.raises(IndexError):
+            batch[2]
+
+    def test_stats(self, path: Path):
+        (batch,) = virtool_core.bio.iter_fastq_read_batches(path)
+
+        assert list(batch.lengths) == [20, 12, 24]
+        assert batch.length_histogram() == {20: 1, 12: 1, 24: 1}
+        assert batch.count("N") == 1
+        assert batch.count("gc") == 25
+        assert batch.gc == 25 / 55
+
+    async def test_read_fastq_batches_from_path(self, path: Path):
+        batches = [
+            batch
+            async for batch in virtool_core.bio.read_fastq_batches_from_path(
+                path,
+                columnar=True,
+            )
+        ]
+
+        assert [type(batch) for batch in batches] == [virtool_core.bio.ReadBatch]
+        assert batches[0].headers == ["@read_1", "@read_2", "@read_3"]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_find_fastq_record(newline: str, tmp_path: Path):
+    """Test that every offset is moved to the start of the next record, including
+    offsets in a quality line that starts with ``@``.
+    """
+    data = FASTQ.replace("\n", newline).encode()
+
+    path = tmp_path / "test.fq"
+    path.write_bytes(data)
+
+    starts = [data.index(header) for header in (b"@read_1", b"@read_2", b"@read_3")]
+
+    with open(path, "rb") as f:
+        for offset in range(len(data) + 1):
+            assert virtool_core.bio._find_fastq_record(f, offset) == min(
+                [start for start in starts if start >= offset],
+                default=len(data),
+            )
+
+
+@pytest.mark.parametrize("processes", [1, 2, 5])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_map_reduce_fastq(processes: int, newline: str, tmp_path: Path):
+    """Test that mapping over shards gives the same result as reading the whole file."""
+    path = tmp_path / "test.fq"
+    path.write_bytes((FASTQ * 20).replace("\n", newline).encode())
+
+    headers = virtool_core.bio.map_reduce_fastq(
+        path,
+        virtool_core.bio._collect_fastq_headers,
+        operator.iadd,
+        processes=processes,
+        min_shard_size=1,
+        binary=True,
+    )
+
+    assert headers == ["@read_1", "@read_2", "@read_3"] * 20
+
+    accumulator = virtool_core.bio.map_reduce_fastq(
+        path,
+        virtool_core.bio._accumulate_quality,
+        virtool_core.bio.QualityAccumulator.merge,
+        processes=processes,
+        min_shard_size=1,
+    )
+
+    assert accumulator.count == 60
+    assert (
+        accumulator.to_quality()
+        == virtool_core.bio.accumulate_fastq_quality(path).to_quality()
+    )
+
+
 async def test_read_fastq_headers(tmpdir):
     tmpfile = tmpdir.join("test.fa")
 
@@ -104,11 +685,38 @@ async def test_read_fastq_headers(tmpdir):
     ]
 
 
-def test_reverse_complement():
-    sequence = "ATAGGGATTAGAGACACAGATA"
-    expected = "TATCTGTGTCTCTAATCCCTAT"
-
+@pytest.mark.parametrize(
+    "sequence,expected",
+    [
+        ("ATAGGGATTAGAGACACAGATA", "TATCTGTGTCTCTAATCCCTAT"),
+        ("atagggaTTAGAGACACAGATA", "TATCTGTGTCTCTAATCCCTAT"),
+        ("ACGTRYSWKMBDHVN", "NBDHVKMWSRYACGT"),
+        ("", ""),
+    ],
+    ids=["uppercase", "lowercase", "iupac", "empty"],
+)
+def test_reverse_complement(sequence: str, expected: str):
     assert virtool_core.bio.reverse_complement(sequence) == expected
+    assert virtool_core.bio.reverse_complement_bytes(
+        sequence.encode(),
+    ) == expected.encode()
+
+    buffer = bytearray(sequence.encode())
+    virtool_core.bio.reverse_complement_inplace(buffer)
+
+    assert buffer == expected.encode()
+
+
+def test_reverse_complement_invalid():
+    buffer = bytearray(b"ACGTX")
+
+    with pytest.raises(ValueError, match="invalid characters"):
+        virtool_core.bio.reverse_complement_inplace(buffer)
+
+    assert buffer == b"ACGTX"
+
+    with pytest.raises(ValueError, match="invalid characters"):
+        virtool_core.bio.reverse_complement("ACGT-")
 
 
 @pytest.mark.parametrize(
@@ -132,6 +740,61 @@ def test_reverse_complement():
 def test_translate(sequence, expected):
     """Test that translation works properly. Cases are standard, resolvable ambiguity, and non-resolvable ambiguity (X)."""
     assert virtool_core.bio.translate(sequence) == expected
+    assert virtool_core.bio.translate(sequence.lower().encode()) == expected
+
+
+def test_translate_frames():
+    sequence = "CATAGGGATTAGAGACACAGATAAGGAGAGATATAGAACATGTGACGTACGTACGATCTGAGCTA"
+
+    assert virtool_core.bio.translate_frames(sequence) == tuple(
+        virtool_core.bio.translate(sequence[frame:]) for frame in range(3)
+    )
+    assert virtool_core.bio.translate_frames("AT") == ("", "", "")
+
+
+def test_translate_many():
+    sequences = ["ATGGGATTA", "ATGGGATT", "", "AT", "ATNGGGATTAG"]
+
+    assert virtool_core.bio.translate_many(sequences) == [
+        "MGL",
+        "MG",
+        "",
+        "",
+        "XGI",
+    ]
+
+
+@pytest.mark.parametrize(
+    "genetic_code,expected",
+    [(1, "MW*RR"), (2, "MWW**"), (4, "MWWRR"), (11, "MW*RR")],
+)
+def test_translate_genetic_code(genetic_code, expected):
+    """Test that codons are reassigned according to the requested genetic code."""
+    sequence = "ATGTGGTGAAGAAGG"
+
+    assert virtool_core.bio.translate(sequence, genetic_code) == expected
+    assert virtool_core.bio.translate_frames(sequence, genetic_code)[0] == expected
+    assert virtool_core.bio.translate_many([sequence], genetic_code) == [expected]
+
+
+def test_translation_table():
+    """Test that ``TRANSLATION_TABLE`` is the standard code with ambiguous codons."""
+    table = virtool_core.bio.TRANSLATION_TABLE
+
+    assert len(table) == 72
+    assert (table["ATG"], table["TAA"], table["TGA"], table["TGG"]) == (
+        "M",
+        "*",
+        "*",
+        "W",
+    )
+    assert (table["GGN"], table["CTN"]) == ("G", "L")
+    assert "ATN" not in table
+
+
+def test_translate_unknown_genetic_code():
+    with pytest.raises(ValueError, match="Unknown genetic code: 7"):
+        virtool_core.bio.translate("ATG", 7)
 
 
 def test_find_orfs(orf_containing):
@@ -139,3 +802,496 @@ def test_find_orfs(orf_containing):
 
     with open(os.path.join(TEST_BIO_PATH, "orfs"), "rb") as f:
         assert pickle.load(f) == result
+
+    assert virtool_core.bio.find_orfs(orf_containing, genetic_code=11) == result
+
+
+def test_orf(orf_containing):
+    """Test that ORF records materialise the same data as the legacy dicts."""
+    with open(os.path.join(TEST_BIO_PATH, "orfs"), "rb") as f:
+        expected = pickle.load(f)
+
+    orfs = virtool_core.bio.find_orfs(orf_containing)
+
+    assert [orf.to_dict() for orf in orfs] == expected
+    assert [dict(orf) for orf in orfs] == expected
+    assert pickle.loads(pickle.dumps(orfs)) == expected
+
+    orf = orfs[0]
+
+    assert (orf.pro, orf.nuc, orf.frame, orf.strand, orf.pos) == (
+        expected[0]["pro"],
+        expected[0]["nuc"],
+        expected[0]["frame"],
+        expected[0]["strand"],
+        expected[0]["pos"],
+    )
+
+    with pytest.raises(KeyError):
+        orf["length"]
+
+    with pytest.raises(AttributeError):
+        orf.extra = 1
+
+
+def test_find_orfs_min_lengths(orf_containing):
+    orfs = virtool_core.bio.find_orfs(orf_containing)
+
+    assert virtool_core.bio.find_orfs(orf_containing, min_protein_length=150) == [
+        orf for orf in orfs if len(orf.pro) >= 150
+    ]
+    assert (
+        virtool_core.bio.find_orfs(
+            orf_containing,
+            min_sequence_length=len(orf_containing) + 1,
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize(
+    "start_codons,nested,min_protein_length,expected",
+    [
+        (None, False, 3, [((3, 27), "AAMAVAA")]),
+        (virtool_core.bio.ATG_START_CODONS, False, 3, [((9, 27), "MAVAA")]),
+        (virtool_core.bio.ATG_START_CODONS, True, 3, [((9, 27), "MAVAA")]),
+        (virtool_core.bio.ALTERNATIVE_START_CODONS, False, 3, [((9, 27), "MAVAA")]),
+        (
+            virtool_core.bio.ALTERNATIVE_START_CODONS,
+            True,
+            3,
+            [((9, 27), "MAVAA"), ((15, 27), "VAA")],
+        ),
+        (virtool_core.bio.ALTERNATIVE_START_CODONS, True, 4, [((9, 27), "MAVAA")]),
+    ],
+    ids=["stop", "atg", "atg_nested", "alternative", "nested", "nested_min"],
+)
+def test_find_orfs_start_codons(start_codons, nested, min_protein_length, expected):
+    """Test that ORFs begin at the requested start codons."""
+    sequence = "TAA" + "GCC" * 2 + "ATG" + "GCC" + "GTG" + "GCC" * 2 + "TAA"
+
+    orfs = virtool_core.bio.find_orfs(
+        sequence,
+        min_sequence_length=1,
+        min_protein_length=min_protein_length,
+        start_codons=start_codons,
+        nested=nested,
+    )
+
+    assert [
+        (orf.pos, orf.pro) for orf in orfs if orf.strand == 1 and orf.frame == 0
+    ] == expected
+
+
+def test_find_orfs_invalid_start_codon():
+    with pytest.raises(ValueError, match="Invalid start codon: AUG"):
+        virtool_core.bio.find_orfs("ATG" * 200, start_codons=["AUG"])
+
+
+@pytest.mark.parametrize("strand", [1, -1])
+def test_find_orfs_circular(strand):
+    """Test that ORFs spanning the origin of a circular sequence are found."""
+    orf = "ATG" + "GCC" * 20 + "TAA"
+    sequence = orf + "CTAG" * 10
+    sequence = sequence[30:] + sequence[:30]
+
+    if strand == -1:
+        sequence = virtool_core.bio.reverse_complement(sequence)
+
+    options = {
+        "min_sequence_length": 1,
+        "min_protein_length": 20,
+        "start_codons": virtool_core.bio.ATG_START_CODONS,
+    }
+
+    linear = virtool_core.bio.find_orfs(sequence, **options)
+    circular = virtool_core.bio.find_orfs(sequence, circular=True, **options)
+
+    assert [found.nuc for found in linear if found.strand == strand] == []
+    assert [
+        (found.pos, found.nuc, found.pro)
+        for found in circular
+        if found.strand == strand
+    ] == [((76, 36) if strand == 1 else (70, 30), orf, "M" + "A" * 20)]
+
+
+@pytest.mark.parametrize("strand", [1, -1])
+def test_find_orfs_circular_upstream_stop(strand):
+    """Test that a circular ORF is found when the stop codon before its start codon
+    comes before the origin and the ORF keeps no repeated copy of the sequence.
+    """
+    sequence = (
+        "GCCAACGGACTATAAGCCACTAAAGATCTCGGCGCGAGGCCAAGAGGGGATGGAAGGTGCGCACAAAGATAGGG"
+        "CCTCAC"
+    )
+
+    if strand == -1:
+        sequence = virtool_core.bio.reverse_complement(sequence)
+
+    orfs = virtool_core.bio.find_orfs(
+        sequence,
+        min_sequence_length=1,
+        min_protein_length=10,
+        circular=True,
+        start_codons=virtool_core.bio.ATG_START_CODONS,
+    )
+
+    assert [(orf.strand, orf.pos, orf.frame, orf.pro) for orf in orfs] == [
+        (
+            strand,
+            (49, 23) if strand == 1 else (57, 31),
+            1,
+            "MEGAHKDRASRQRTISH",
+        ),
+    ]
+
+    assert len(orfs[0]._source) == len(sequence)
+    assert json.loads(json.dumps(orfs[0].to_dict()))["nuc"] == orfs[0].nuc
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 1024 * 1024])
+def test_find_orfs_batch(processes, chunk_size, orf_containing):
+    """Test that batched ORF finding matches ``find_orfs`` for every sequence."""
+    sequences = [
+        orf_containing,
+        orf_containing[:200],
+        virtool_core.bio.reverse_complement(orf_containing).encode(),
+        orf_containing,
+    ]
+
+    result = dict(
+        virtool_core.bio.find_orfs_batch(
+            iter(sequences),
+            processes=processes,
+            chunk_size=chunk_size,
+            min_protein_length=50,
+        ),
+    )
+
+    assert result == {
+        index: virtool_core.bio.find_orfs(
+            sequence.decode() if isinstance(sequence, bytes) else sequence,
+            min_protein_length=50,
+        )
+        for index, sequence in enumerate(sequences)
+    }
+
+
+class TestQualityAccumulator:
+    RECORDS = [
+        ("@read_1", "GATC", "IIII"),
+        ("@read_2", "GGAN", "##5I"),
+        ("@read_3", "G", "5"),
+    ]
+
+    def test_to_quality(self):
+        accumulator = virtool_core.bio.QualityAccumulator()
+        accumulator.add(self.RECORDS)
+
+        quality = accumulator.to_quality()
+
+        assert quality.bases == [
+            [20.67, 20, 2, 40, 2, 40],
+            [21.0, 2, 2, 40, 2, 40],
+            [30.0, 20, 20, 40, 20, 40],
+            [40.0, 40, 40, 40, 40, 40],
+        ]
+        assert quality.composition == [
+            [100.0, 0.0, 0.0, 0.0],
+            [50.0, 50.0, 0.0, 0.0],
+            [0.0, 50.0, 50.0, 0.0],
+            [0.0, 0.0, 0.0, 100.0],
+        ]
+        assert quality.count == 3
+        assert quality.encoding == "Sanger / Illumina 1.9"
+        assert quality.gc == 62.5
+        assert quality.length == [1, 4]
+        assert quality.sequences == [
+            1 if index in (16, 20, 40) else 0 for index in range(50)
+        ]
+
+    def test_merge(self):
+        """Test that merged partial accumulators match one accumulator for all reads."""
+        whole = virtool_core.bio.QualityAccumulator()
+        whole.add(self.RECORDS)
+
+        first = virtool_core.bio.QualityAccumulator()
+        first.add(self.RECORDS[2:])
+
+        second = virtool_core.bio.QualityAccumulator()
+        second.add(self.RECORDS[:2])
+
+        assert first.merge(second).to_quality() == whole.to_quality()
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError, match="Sequence and quality lengths differ"):
+            virtool_core.bio.QualityAccumulator().add([("@read_1", "GATC", "III")])
+
+
+async def test_calculate_quality(tmp_path: Path):
+    path = tmp_path / "reads.fq.gz"
+    path.write_bytes(gzip.compress(FASTQ.encode()))
+
+    quality = await virtool_core.bio.calculate_quality([path, path])
+
+    assert quality.count == 6
+    assert quality.encoding == "Sanger / Illumina 1.9"
+    assert quality.length == [12, 24]
+    assert len(quality.bases) == len(quality.composition) == 24
+    assert sum(quality.sequences) == 6
+
+
+@pytest.mark.parametrize("kmer", ["A", "ACGT", "TTTT", "GATTACA" * 4 + "CCGG"])
+def test_pack_kmer(kmer: str):
+    packed = virtool_core.bio.pack_kmer(kmer)
+
+    assert packed < 4 ** len(kmer)
+    assert virtool_core.bio.unpack_kmer(packed, len(kmer)) == kmer
+
+
+def test_pack_kmer_invalid():
+    with pytest.raises(ValueError, match="K-mer contains invalid characters"):
+        virtool_core.bio.pack_kmer("ACNT")
+
+
+@pytest.mark.parametrize(
+    "canonical,expected",
+    [
+        (True, {"AC": 3, "CG": 1, "CC": 1}),
+        (False, {"AC": 1, "CG": 1, "GT": 2, "CC": 1}),
+    ],
+)
+def test_count_kmers(canonical: bool, expected: dict[str, int]):
+    """Test that k-mers are counted on both strands and never span ambiguous bases."""
+    counts = virtool_core.bio.count_kmers(["ACGT", "gtnCC"], 2, canonical=canonical)
+
+    assert {
+        virtool_core.bio.unpack_kmer(packed, 2): count
+        for packed, count in counts.items()
+    } == expected
+
+
+@pytest.mark.parametrize("k", [0, 33])
+def test_count_kmers_invalid_k(k: int):
+    with pytest.raises(ValueError, match="k must be between 1 and 32"):
+        virtool_core.bio.count_kmers(["ACGT"], k)
+
+
+@pytest.mark.parametrize("w", [1, 4, 50])
+def test_find_minimizers(w: int, orf_containing: str):
+    """Test that minimizers match a brute-force search over every window."""
+    sequence = orf_containing[:500]
+    k = 11
+
+    hashes = [
+        virtool_core.bio._hash_kmer(packed)
+        for _, packed in virtool_core.bio._iter_kmers(sequence, k, True)
+    ]
+
+    expected = []
+
+    for start in range(max(len(hashes) - w + 1, 1)):
+        window = hashes[start : start + w]
+        position = start + window.index(min(window))
+        minimizer = (position, hashes[position])
+
+        if not expected or expected[-1] != minimizer:
+            expected.append(minimizer)
+
+    assert virtool_core.bio.find_minimizers(sequence, k, w) == expected
+
+
+class TestKmerSketch:
+    def test_reverse_complement(self, orf_containing: str):
+        """Test that a sequence and its reverse complement have the same sketch."""
+        assert virtool_core.bio.KmerSketch.from_sequences(
+            [orf_containing],
+        ) == virtool_core.bio.KmerSketch.from_sequences(
+            [virtool_core.bio.reverse_complement(orf_containing)],
+        )
+
+    def test_compare(self, orf_containing: str):
+        whole = virtool_core.bio.KmerSketch.from_sequences([orf_containing], size=100)
+        reads = virtool_core.bio.KmerSketch.from_sequences(
+            orf_containing[i : i + 150] for i in range(0, len(orf_containing), 100)
+        )
+
+        assert whole.jaccard(whole) == 1.0
+        assert reads.containment(whole) == 1.0
+        assert 0.9 < whole.jaccard(reads) <= 1.0
+
+        unrelated = virtool_core.bio.KmerSketch.from_sequences(["ACGT" * 100])
+
+        assert whole.jaccard(unrelated) == 0.0
+        assert unrelated.containment(whole) == 0.0
+
+    def test_merge(self, orf_containing: str):
+        """Test that merging sketches matches sketching both halves together."""
+        half = len(orf_containing) // 2
+        first = virtool_core.bio.KmerSketch.from_sequences([orf_containing[:half]])
+        second = virtool_core.bio.KmerSketch.from_sequences([orf_containing[half:]])
+
+        assert first.merge(second) == virtool_core.bio.KmerSketch.from_sequences(
+            [orf_containing[:half], orf_containing[half:]],
+        )
+
+    def test_different_k(self):
+        with pytest.raises(ValueError, match="Sketches have different k-mer lengths"):
+            virtool_core.bio.KmerSketch(k=21).jaccard(virtool_core.bio.KmerSketch(k=31))
+
+
+class TestCalculateNucleotideComposition:
+    FASTA = ">seq_1 AAAAAAAAAA\nACGTN\nacgtR\n>seq_2\nAAAA\n>seq_3 CCCC\nGG"
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_ok(self, compression: str | None, newline: str, tmp_path: Path):
+        data = self.FASTA.replace("\n", newline).encode()
+
+        path = tmp_path / "test.fa"
+
+        if compression:
+            data = gzip.compress(data)
+
+        path.write_bytes(data)
+
+        assert virtool_core.bio.calculate_nucleotide_composition(
+            path,
+        ) == NucleotideComposition(a=6 / 16, c=2 / 16, g=4 / 16, t=2 / 16, n=2 / 16)
+
+    def test_sharded(self, tmp_path: Path):
+        """Test that counting line-aligned shards in parallel gives the same result."""
+        path = tmp_path / "test.fa"
+        path.write_text((self.FASTA + "\n") * 50)
+
+        assert virtool_core.bio.calculate_nucleotide_composition(
+            path,
+            processes=4,
+            min_shard_size=1,
+        ) == virtool_core.bio.calculate_nucleotide_composition(path)
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 11, 1024])
+    def test_chunks(self, chunk_size: int, newline: str):
+        """Test that lines and headers split between chunks are counted once."""
+        data = self.FASTA.replace("\n", newline).encode()
+
+        assert virtool_core.bio._count_composition_chunks(
+            data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+        ) == [6, 2, 4, 2, 2]
+
+    @pytest.mark.parametrize(
+        "fasta",
+        [">a\n>b\nACGT\n", ">a\n>b\nACGT\n>c\n", ">a\nACGT\n>b\n>c"],
+        ids=["first", "last", "last_no_newline"],
+    )
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 1024])
+    def test_empty_records(self, chunk_size: int, fasta: str, tmp_path: Path):
+        """Test that headers directly following other headers are not counted."""
+        data = fasta.encode()
+
+        assert virtool_core.bio._count_composition_chunks(
+            data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+        ) == [1, 1, 1, 1, 0]
+
+        path = tmp_path / "test.fa"
+        path.write_bytes(data)
+
+        assert virtool_core.bio.calculate_nucleotide_composition(
+            path,
+        ) == NucleotideComposition(a=0.25, c=0.25, g=0.25, t=0.25, n=0)
+
+    def test_single_line(self, tmp_path: Path):
+        """Test that long single-line records are counted across many chunks."""
+        path = tmp_path / "test.fa"
+        path.write_bytes(
+            b">seq_1 " + b"ACGT" * 1000 + b"\n" + b"ACGTN" * 500000 + b"\n>seq_2\nGG",
+        )
+
+        assert virtool_core.bio.calculate_nucleotide_composition(
+            path,
+        ) == NucleotideComposition(
+            a=500000 / 2500002,
+            c=500000 / 2500002,
+            g=500002 / 2500002,
+            t=500000 / 2500002,
+            n=500000 / 2500002,
+        )
+
+    def test_empty(self, tmp_path: Path):
+        path = tmp_path / "test.fa"
+        path.write_text("")
+
+        assert virtool_core.bio.calculate_nucleotide_composition(
+            path,
+        ) == NucleotideComposition(a=0, c=0, g=0, t=0, n=0)
+
+
+class TestPackedSequence:
+    SEQUENCE = "ACGTNNNNacgtRYACGTTGCAAGGCTTN"
+
+    #: Has exception runs that start and end partway through packed bytes.
+    UNALIGNED = "NNNACGTRYNN" + "A" * 17 + "NNNNN" + "CGTAC" + "WSK" + "T"
+
+    def test_round_trip(self):
+        packed = virtool_core.bio.PackedSequence(self.SEQUENCE)
+
+        assert len(packed) == len(self.SEQUENCE)
+        assert str(packed) == self.SEQUENCE.upper()
+        assert packed == self.SEQUENCE.upper()
+        assert packed.nbytes == 8
+
+    @pytest.mark.parametrize("sequence", ["", "A", "N", "ACG", "NNNNACGT"])
+    def test_short(self, sequence: str):
+        assert str(virtool_core.bio.PackedSequence(sequence)) == sequence
+
+    def test_non_ascii(self):
+        with pytest.raises(ValueError, match="non-ASCII"):
+            virtool_core.bio.PackedSequence("ACGTé")
+
+    @pytest.mark.parametrize("sequence", [SEQUENCE, UNALIGNED])
+    def test_getitem(self, sequence: str):
+        packed = virtool_core.bio.PackedSequence(sequence)
+        expected = sequence.upper()
+
+        assert [packed[i] for i in range(-len(expected), len(expected))] == list(
+            expected * 2,
+        )
+
+        for start in range(len(expected) + 1):
+            for stop in range(start, len(expected) + 2):
+                assert packed[start:stop] == expected[start:stop]
+
+        assert packed[::-3] == expected[::-3]
+
+        with pytest.raises(IndexError):
+            packed[len(expected)]
+
+    def test_reverse_complement(self):
+        packed = virtool_core.bio.PackedSequence(self.SEQUENCE)
+
+        assert packed.reverse_complement() == virtool_core.bio.reverse_complement(
+            self.SEQUENCE.upper(),
+        )
+
+    def test_reverse_complement_other_characters(self):
+        """Test that characters without a complement are kept in place."""
+        packed = virtool_core.bio.PackedSequence("AC-GT.*NR")
+
+        assert packed.reverse_complement() == "YN*.AC-GT"
+
+    def test_pickle(self):
+        packed = virtool_core.bio.PackedSequence(self.SEQUENCE)
+        assert pickle.loads(pickle.dumps(packed)) == packed
+
+    def test_pydantic(self):
+        class Model(BaseModel):
+            sequence: virtool_core.bio.PackedSequence
+
+        model = Model(sequence="ACGTN")
+
+        assert isinstance(model.sequence, virtool_core.bio.PackedSequence)
+        assert model.model_dump() == {"sequence": "ACGTN"}
+        assert Model.model_validate_json(model.model_dump_json()) == model
+        assert Model(sequence=model.sequence).sequence is model.sequence
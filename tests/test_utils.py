@@ -1,6 +1,12 @@
+import asyncio
+import bz2
+import gzip
 import os
 import shutil
+import subprocess
 import sys
+import tarfile
+import zlib
 from pathlib import Path
 
 import arrow
@@ -8,11 +14,85 @@ import pytest
 from pytest_mock import MockerFixture
 
 import virtool_core.utils
-from virtool_core.utils import should_use_pigz
+from virtool_core.utils import (
+    ParallelGzipWriter,
+    detect_compression,
+    open_decompressed,
+    should_use_pigz,
+    strip_compression_suffix,
+)
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 
+def write_compressed(path: Path, data: bytes, compression: str | None):
+    """Write ``data`` to ``path`` compressed using ``compression``."""
+    if compression == "gzip":
+        path.write_bytes(gzip.compress(data))
+    elif compression == "bzip2":
+        path.write_bytes(bz2.compress(data))
+    elif compression == "zstd":
+        path.write_bytes(
+            subprocess.run(
+                ["zstd", "-c"],
+                input=data,
+                capture_output=True,
+                check=True,
+            ).stdout,
+        )
+    else:
+        path.write_bytes(data)
+
+
+skip_without_zstd = pytest.mark.skipif(
+    shutil.which("zstd") is None,
+    reason="zstd binary is not installed",
+)
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [None, "gzip", "bzip2", pytest.param("zstd", marks=skip_without_zstd)],
+)
+def test_detect_compression(compression: str | None, tmp_path: Path):
+    path = tmp_path / "file"
+    write_compressed(path, b"hello world\n" * 100, compression)
+
+    assert detect_compression(path) == compression
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [None, "gzip", "bzip2", pytest.param("zstd", marks=skip_without_zstd)],
+)
+def test_open_decompressed(compression: str | None, tmp_path: Path):
+    path = tmp_path / "file"
+    write_compressed(path, b"hello world\n" * 10000, compression)
+
+    with open_decompressed(path) as f:
+        assert f.read() == b"hello world\n" * 10000
+
+
+@skip_without_zstd
+def test_open_decompressed_early_exit(tmp_path: Path):
+    """Test that a decompression process is cleaned up when the stream is not read to
+    the end.
+    """
+    path = tmp_path / "file.zst"
+    write_compressed(path, os.urandom(1024) * 10000, "zstd")
+
+    with open_decompressed(path) as f:
+        assert len(f.read(1024)) == 1024
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [("reads.fq", "reads.fq"), ("reads.fq.gz", "reads.fq"), ("ref.fa.zst", "ref.fa")],
+)
+def test_strip_compression_suffix(path: str, expected: str):
+    assert strip_compression_suffix(Path(path)) == Path(expected)
+
+
 def test_decompress_tgz(tmpdir):
     path = Path(tmpdir)
 
@@ -34,6 +114,456 @@ def test_decompress_tgz(tmpdir):
     }
 
 
+class TestParallelGzipWriter:
+    @pytest.mark.parametrize("block_size", [1, 1000, 1024 * 1024])
+    def test_ok(self, block_size: int, tmp_path: Path):
+        """Test that the blocks are written in order as valid gzip members."""
+        data = os.urandom(1024) * 10 + b"hello world\n" * 10000
+
+        with ParallelGzipWriter(
+            tmp_path / "test.gz",
+            processes=3,
+            block_size=block_size * 7,
+        ) as f:
+            for i in range(0, len(data), 5000):
+                f.write(data[i : i + 5000])
+
+        assert gzip.decompress((tmp_path / "test.gz").read_bytes()) == data
+
+    def test_empty(self, tmp_path: Path):
+        with ParallelGzipWriter(tmp_path / "test.gz", processes=2):
+            pass
+
+        assert gzip.decompress((tmp_path / "test.gz").read_bytes()) == b""
+
+    def test_error(self, tmp_path: Path):
+        """Test that an exception raised while compressing a block is re-raised."""
+        f = ParallelGzipWriter(tmp_path / "test.gz", processes=2, compresslevel=42)
+        f.write(b"hello world")
+
+        with pytest.raises(zlib.error):
+            f.close()
+
+        assert f.closed
+
+
+@pytest.mark.parametrize("processes", [1, 4])
+def test_compress_file(processes: int, tmp_path: Path, mocker: MockerFixture):
+    mocker.patch("shutil.which", return_value=None)
+
+    data = b"hello world\n" * 100000
+    (tmp_path / "test.txt").write_bytes(data)
+
+    virtool_core.utils.compress_file(
+        tmp_path / "test.txt",
+        tmp_path / "test.txt.gz",
+        processes,
+    )
+
+    assert gzip.decompress((tmp_path / "test.txt.gz").read_bytes()) == data
+
+
+@pytest.mark.parametrize("processes", [1, 4])
+def test_decompress_file_bzip2(processes: int, tmp_path: Path):
+    """Test that bzip2-compressed files are not passed to gzip or pigz."""
+    data = b"hello world\n" * 100000
+    (tmp_path / "test.txt.bz2").write_bytes(bz2.compress(data))
+
+    virtool_core.utils.decompress_file(
+        tmp_path / "test.txt.bz2",
+        tmp_path / "out.txt",
+        processes,
+    )
+
+    assert (tmp_path / "out.txt").read_bytes() == data
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        virtool_core.utils.compress_file_with_pigz,
+        virtool_core.utils.decompress_file_with_pigz,
+    ],
+)
+def test_pigz_exit_status(func, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that a non-zero pigz exit status raises an exception."""
+    bin_path = tmp_path / "bin"
+    bin_path.mkdir()
+
+    pigz_path = bin_path / "pigz"
+    pigz_path.write_text("#!/bin/sh\nexit 1\n")
+    pigz_path.chmod(0o755)
+
+    monkeypatch.setenv("PATH", str(bin_path), prepend=os.pathsep)
+
+    (tmp_path / "test.txt").write_text("hello world")
+
+    with pytest.raises(subprocess.CalledProcessError):
+        func(tmp_path / "test.txt", tmp_path / "out", 2)
+
+
+@pytest.fixture()
+def fake_pigz(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Put a ``pigz`` script that drops the ``-p`` option and runs gzip on the PATH."""
+    bin_path = tmp_path / "bin"
+    bin_path.mkdir()
+
+    pigz_path = bin_path / "pigz"
+    pigz_path.write_text('#!/bin/sh\nshift 2\nexec gzip "$@"\n')
+    pigz_path.chmod(0o755)
+
+    monkeypatch.setenv("PATH", str(bin_path), prepend=os.pathsep)
+
+
+class TestAsyncCompression:
+    DATA = os.urandom(1024) * 3000
+
+    @pytest.mark.parametrize("processes", [1, 2])
+    async def test_round_trip(self, processes: int, tmp_path: Path):
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        compressed = []
+        decompressed = []
+
+        await virtool_core.utils.compress_file_async(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.gz",
+            processes,
+            progress=compressed.append,
+        )
+
+        await virtool_core.utils.decompress_file_async(
+            tmp_path / "test.txt.gz",
+            tmp_path / "out.txt",
+            processes,
+            progress=decompressed.append,
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+        assert compressed[-1] == decompressed[-1] == len(self.DATA)
+        assert compressed == sorted(compressed)
+
+    async def test_pigz(self, fake_pigz, tmp_path: Path):
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        compressed = []
+        decompressed = []
+
+        await virtool_core.utils.compress_file_async(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.gz",
+            2,
+            progress=compressed.append,
+        )
+
+        assert gzip.decompress((tmp_path / "test.txt.gz").read_bytes()) == self.DATA
+
+        await virtool_core.utils.decompress_file_async(
+            tmp_path / "test.txt.gz",
+            tmp_path / "out.txt",
+            2,
+            progress=decompressed.append,
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+        assert compressed[-1] == decompressed[-1] == len(self.DATA)
+
+    @pytest.mark.parametrize("processes", [1, 2])
+    async def test_bzip2(self, processes: int, fake_pigz, tmp_path: Path):
+        (tmp_path / "test.txt.bz2").write_bytes(bz2.compress(self.DATA))
+
+        decompressed = []
+
+        await virtool_core.utils.decompress_file_async(
+            tmp_path / "test.txt.bz2",
+            tmp_path / "out.txt",
+            processes,
+            progress=decompressed.append,
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+        assert decompressed[-1] == len(self.DATA)
+
+    async def test_pigz_exit_status(self, fake_pigz, tmp_path: Path):
+        (tmp_path / "test.txt").write_bytes(b"not gzipped")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            await virtool_core.utils.decompress_file_async(
+                tmp_path / "test.txt",
+                tmp_path / "out.txt",
+                2,
+            )
+
+    @pytest.mark.parametrize("pigz", [False, True])
+    async def test_cancel(self, pigz: bool, tmp_path: Path, request):
+        """Test that cancelling stops compression and removes the target."""
+        if pigz:
+            request.getfixturevalue("fake_pigz")
+
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        task = asyncio.create_task(
+            virtool_core.utils.compress_file_async(
+                tmp_path / "test.txt",
+                tmp_path / "test.txt.gz",
+                2,
+                progress=lambda count: task.cancel(),
+            ),
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not (tmp_path / "test.txt.gz").exists()
+
+    async def test_decompress_tgz(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.txt").write_bytes(b"a" * 100)
+        (tmp_path / "src" / "b.txt").write_bytes(b"b" * 50)
+
+        with tarfile.open(tmp_path / "test.tar.gz", "w:gz") as tar:
+            tar.add(tmp_path / "src", arcname="src")
+
+        progress = []
+
+        await virtool_core.utils.decompress_tgz_async(
+            tmp_path / "test.tar.gz",
+            tmp_path / "out",
+            progress=progress.append,
+        )
+
+        assert (tmp_path / "out" / "src" / "a.txt").read_bytes() == b"a" * 100
+        assert (tmp_path / "out" / "src" / "b.txt").read_bytes() == b"b" * 50
+        assert progress[-1] == 150
+
+
+class TestStreamingGzip:
+    DATA = os.urandom(1024) * 100 + b"hello world\n" * 10000
+
+    @staticmethod
+    def split(data: bytes, size: int) -> list[bytes]:
+        return [data[i : i + size] for i in range(0, len(data), size)]
+
+    @pytest.mark.parametrize("size", [7, 1000, 1024 * 1024])
+    def test_round_trip(self, size: int):
+        compressed = b"".join(
+            virtool_core.utils.compress_chunks(self.split(self.DATA, size)),
+        )
+
+        assert gzip.decompress(compressed) == self.DATA
+        assert (
+            b"".join(
+                virtool_core.utils.decompress_chunks(self.split(compressed, size)),
+            )
+            == self.DATA
+        )
+
+    def test_multiple_members(self, tmp_path: Path):
+        with ParallelGzipWriter(tmp_path / "test.gz", block_size=1000) as f:
+            f.write(self.DATA)
+
+        compressed = (tmp_path / "test.gz").read_bytes()
+
+        assert (
+            b"".join(virtool_core.utils.decompress_chunks(self.split(compressed, 333)))
+            == self.DATA
+        )
+
+    def test_empty(self):
+        assert b"".join(virtool_core.utils.decompress_chunks([])) == b""
+        assert gzip.decompress(b"".join(virtool_core.utils.compress_chunks([]))) == b""
+
+    def test_truncated(self):
+        compressed = gzip.compress(self.DATA)
+
+        with pytest.raises(EOFError):
+            b"".join(virtool_core.utils.decompress_chunks([compressed[:-10]]))
+
+    async def test_async(self):
+        async def iterate(chunks):
+            for chunk in chunks:
+                yield chunk
+
+        compressed = [
+            chunk
+            async for chunk in virtool_core.utils.compress_chunks_async(
+                iterate([self.DATA[:100], self.DATA[100:]]),
+            )
+        ]
+
+        assert gzip.decompress(b"".join(compressed)) == self.DATA
+
+        decompressed = [
+            chunk
+            async for chunk in virtool_core.utils.decompress_chunks_async(
+                iterate(self.split(b"".join(compressed), 100000)),
+            )
+        ]
+
+        assert b"".join(decompressed) == self.DATA
+
+
+@pytest.mark.skipif(not shutil.which("zstd"), reason="zstd is not installed")
+class TestZstd:
+    DATA = b"hello world\n" * 100000
+
+    @pytest.mark.parametrize("level,threads", [(1, 1), (3, 2), (20, 1)])
+    def test_round_trip(self, level: int, threads: int, tmp_path: Path):
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        virtool_core.utils.compress_file_with_zstd(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.zst",
+            level=level,
+            threads=threads,
+        )
+
+        assert detect_compression(tmp_path / "test.txt.zst") == "zstd"
+
+        virtool_core.utils.decompress_file_with_zstd(
+            tmp_path / "test.txt.zst",
+            tmp_path / "out.txt",
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_compress_file(self, compression: str, tmp_path: Path):
+        """Test that ``decompress_file`` picks the codec used by ``compress_file``."""
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        virtool_core.utils.compress_file(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.compressed",
+            compression=compression,
+        )
+
+        assert detect_compression(tmp_path / "test.txt.compressed") == compression
+        assert virtool_core.utils.is_gzipped(tmp_path / "test.txt.compressed") == (
+            compression == "gzip"
+        )
+
+        virtool_core.utils.decompress_file(
+            tmp_path / "test.txt.compressed",
+            tmp_path / "out.txt",
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    async def test_async(self, compression: str, tmp_path: Path):
+        """Test that the async variants pick the codec like the sync ones."""
+        (tmp_path / "test.txt").write_bytes(self.DATA)
+
+        compressed = []
+        decompressed = []
+
+        await virtool_core.utils.compress_file_async(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.compressed",
+            2,
+            progress=compressed.append,
+            compression=compression,
+        )
+
+        assert detect_compression(tmp_path / "test.txt.compressed") == compression
+
+        await virtool_core.utils.decompress_file_async(
+            tmp_path / "test.txt.compressed",
+            tmp_path / "out.txt",
+            2,
+            progress=decompressed.append,
+        )
+
+        assert (tmp_path / "out.txt").read_bytes() == self.DATA
+        assert compressed[-1] == decompressed[-1] == len(self.DATA)
+
+    def test_invalid_level(self, tmp_path: Path):
+        with pytest.raises(ValueError, match="zstd level must be between 1 and 22"):
+            virtool_core.utils.compress_file_with_zstd(
+                tmp_path / "test.txt",
+                tmp_path / "test.txt.zst",
+                level=23,
+            )
+
+    def test_unsupported(self, tmp_path: Path):
+        with pytest.raises(ValueError, match="Unsupported compression format: lz4"):
+            virtool_core.utils.compress_file(
+                tmp_path / "test.txt",
+                tmp_path / "test.txt.lz4",
+                compression="lz4",
+            )
+
+
+def test_zstd_missing(tmp_path: Path, mocker: MockerFixture):
+    mocker.patch("shutil.which", return_value=None)
+
+    with pytest.raises(OSError, match="The zstd binary is required"):
+        virtool_core.utils.compress_file(
+            tmp_path / "test.txt",
+            tmp_path / "test.txt.zst",
+            compression="zstd",
+        )
+
+
+class TestExtractTgz:
+    @pytest.fixture()
+    def tgz_path(self, tmp_path: Path) -> Path:
+        src_path = tmp_path / "src"
+        (src_path / "nested").mkdir(parents=True)
+        (src_path / "a.txt").write_bytes(b"a" * 100)
+        (src_path / "nested" / "b.txt").write_bytes(os.urandom(5000))
+        (src_path / "nested").chmod(0o555)
+
+        with tarfile.open(tmp_path / "test.tar.gz", "w:gz") as tar:
+            tar.add(src_path, arcname="bundle")
+
+        return tmp_path / "test.tar.gz"
+
+    def check(self, tmp_path: Path):
+        out_path = tmp_path / "out" / "bundle"
+
+        assert (out_path / "a.txt").read_bytes() == b"a" * 100
+        assert (out_path / "nested" / "b.txt").read_bytes() == (
+            tmp_path / "src" / "nested" / "b.txt"
+        ).read_bytes()
+        assert (out_path / "nested").stat().st_mode & 0o777 == 0o555
+
+    def test_ok(self, tgz_path: Path, tmp_path: Path):
+        virtool_core.utils.decompress_tgz(tgz_path, tmp_path / "out")
+        self.check(tmp_path)
+
+    def test_pigz(self, fake_pigz, tgz_path: Path, tmp_path: Path):
+        """Test that an archive decompressed through a pipe is extracted in one pass."""
+        virtool_core.utils.decompress_tgz(tgz_path, tmp_path / "out", processes=2)
+        self.check(tmp_path)
+
+    async def test_async(self, fake_pigz, tgz_path: Path, tmp_path: Path):
+        progress = []
+
+        await virtool_core.utils.decompress_tgz_async(
+            tgz_path,
+            tmp_path / "out",
+            processes=2,
+            progress=progress.append,
+        )
+
+        self.check(tmp_path)
+        assert progress[-1] == 5100
+
+    def test_path_traversal(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "evil.txt").write_text("evil")
+
+        with tarfile.open(tmp_path / "test.tar.gz", "w:gz") as tar:
+            tar.add(tmp_path / "src" / "evil.txt", arcname="../evil.txt")
+
+        with pytest.raises(Exception, match="Attempted Path Traversal in Tar File"):
+            virtool_core.utils.decompress_tgz(tmp_path / "test.tar.gz", tmp_path / "out")
+
+        assert not (tmp_path / "evil.txt").exists()
+
+
 @pytest.mark.parametrize(
     "recursive,expected",
     [(True, {"foo.txt"}), (False, {"foo.txt", "baz"})],
@@ -1,292 +1,3243 @@
 import asyncio
+import bisect
+import codecs
+import heapq
+import mmap
+import operator
+import os
+import re
+import threading
+from array import array
+from collections import Counter, deque
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import aclosing
+from functools import cache, reduce
+from itertools import accumulate, islice, product, repeat
 from pathlib import Path
-from typing import AsyncIterable
-
-COMPLEMENT_TABLE = {"A": "T", "T": "A", "G": "C", "C": "G", "N": "N"}
-
-#: A standard translation table, including ambiguity.
-TRANSLATION_TABLE = {
-    "TTT": "F",
-    "TTC": "F",
-    "TTA": "L",
-    "TTG": "L",
-    "CTT": "L",
-    "CTC": "L",
-    "CTA": "L",
-    "CTG": "L",
-    "CTN": "L",
-    "ATT": "I",
-    "ATC": "I",
-    "ATA": "I",
-    "ATG": "M",
-    "GTT": "V",
-    "GTC": "V",
-    "GTA": "V",
-    "GTG": "V",
-    "GTN": "V",
-    "TCT": "S",
-    "TCC": "S",
-    "TCA": "S",
-    "TCG": "S",
-    "TCN": "S",
-    "AGT": "S",
-    "AGC": "S",
-    "CCT": "P",
-    "CCC": "P",
-    "CCA": "P",
-    "CCG": "P",
-    "CCN": "P",
-    "ACT": "T",
-    "ACC": "T",
-    "ACA": "T",
-    "ACG": "T",
-    "ACN": "T",
-    "GCT": "A",
-    "GCC": "A",
-    "GCA": "A",
-    "GCG": "A",
-    "GCN": "A",
-    "TAT": "Y",
-    "TAC": "Y",
-    "TAA": "*",
-    "TAG": "*",
-    "TGA": "*",
-    "CAT": "H",
-    "CAC": "H",
-    "CAA": "Q",
-    "CAG": "Q",
-    "AAT": "N",
-    "AAC": "N",
-    "AAA": "K",
-    "AAG": "K",
-    "GAT": "D",
-    "GAC": "D",
-    "GAA": "E",
-    "GAG": "E",
-    "TGT": "C",
-    "TGC": "C",
-    "TGG": "W",
-    "CGT": "R",
-    "CGC": "R",
-    "CGA": "R",
-    "CGG": "R",
-    "CGN": "R",
-    "AGA": "R",
-    "AGG": "R",
-    "GGT": "G",
-    "GGC": "G",
-    "GGA": "G",
-    "GGG": "G",
-    "GGN": "G",
+from typing import IO, Any, AnyStr, AsyncIterable, NamedTuple, TypeVar
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+from virtool_core.models.samples import Quality
+from virtool_core.models.subtraction import NucleotideComposition
+from virtool_core.utils import (
+    detect_compression,
+    open_decompressed,
+    strip_compression_suffix,
+)
+
+T = TypeVar("T")
+
+#: The number of characters read from disk at a time when parsing FASTQ files. Chunks
+#: of this size split quickly while their lines still fit in the CPU cache.
+FASTQ_CHUNK_SIZE = 64 * 1024
+
+#: The number of characters read from disk at a time when parsing FASTA files.
+FASTA_CHUNK_SIZE = 1024 * 1024
+
+#: The smallest byte range of an uncompressed FASTA file that is counted in its own
+#: process by :func:`calculate_nucleotide_composition`.
+FASTA_MIN_SHARD_SIZE = 64 * 1024 * 1024
+
+#: The file suffixes accepted for FASTA files, before any compression suffix.
+FASTA_SUFFIXES = (".fa", ".fasta", ".fna")
+
+#: The smallest byte range of an uncompressed FASTQ file that is parsed in its own
+#: process by :func:`map_reduce_fastq`.
+FASTQ_MIN_SHARD_SIZE = 16 * 1024 * 1024
+
+#: Matches the part of each line of joined FASTQ headers that differs between mates:
+#: a ``/1`` or ``/2`` suffix on the read name and any comment after whitespace.
+MATE_SUFFIX_PATTERN = re.compile(r"[ \t][^\n]*|/[12](?=[ \t\n]|\Z)")
+
+#: The default number of FASTQ records passed from a reader thread to the event loop
+#: at a time.
+FASTQ_BATCH_SIZE = 1000
+
+#: The default number of batches a reader thread can get ahead of its consumer.
+MAX_QUEUED_BATCHES = 8
+
+#: Start codons for ORFs that must begin with methionine.
+ATG_START_CODONS = frozenset({"ATG"})
+
+#: Start codons including the common alternative starts used by bacteria, archaea,
+#: and many viruses.
+ALTERNATIVE_START_CODONS = frozenset({"ATG", "CTG", "GTG", "TTG"})
+
+#: The number of nucleotides sent to a worker process at once by
+#: :func:`find_orfs_batch`.
+ORF_CHUNK_SIZE = 1024 * 1024
+
+#: The complement of each IUPAC nucleotide code.
+COMPLEMENT_TABLE = {
+    "A": "T",
+    "T": "A",
+    "U": "A",
+    "G": "C",
+    "C": "G",
+    "R": "Y",
+    "Y": "R",
+    "S": "S",
+    "W": "W",
+    "K": "M",
+    "M": "K",
+    "B": "V",
+    "V": "B",
+    "D": "H",
+    "H": "D",
+    "N": "N",
 }
 
 
+def _make_complement_translation() -> bytes:
+    """Compile :data:`COMPLEMENT_TABLE` into a table for :meth:`bytes.translate`.
+
+    Lowercase bases are complemented to uppercase. Invalid characters are translated
+    to null bytes so they can be found in a single search.
+    """
+    table = bytearray(256)
+
+    for base, complement in COMPLEMENT_TABLE.items():
+        table[ord(base)] = table[ord(base.lower())] = ord(complement)
+
+    return bytes(table)
+
+
+_COMPLEMENT_TRANSLATION = _make_complement_translation()
+
+#: The amino acids encoded by each NCBI genetic code, keyed by translation table ID.
+#: Each string lists the amino acids for the 64 codons in ``TCAG`` order: ``TTT``,
+#: ``TTC``, ``TTA``, ``TTG``, ``TCT``, and so on to ``GGG``.
+GENETIC_CODES = {
+    1: "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    2: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG",
+    3: "FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    4: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    5: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG",
+    6: "FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    9: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    10: "FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    11: "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    12: "FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    13: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG",
+    14: "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    16: "FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    21: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG",
+    22: "FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    23: "FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+    24: "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG",
+    25: "FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG",
+}
+
+
+def _make_codon_table(genetic_code: int) -> dict[str, str]:
+    """Return the amino acid encoded by each codon in an NCBI genetic code.
+
+    A codon ending in ``N`` is included when all four codons it could stand for
+    encode the same amino acid.
+
+    :param genetic_code: the NCBI translation table ID
+    :return: amino acids keyed by codon
+
+    """
+    try:
+        amino_acids = GENETIC_CODES[genetic_code]
+    except KeyError:
+        raise ValueError(f"Unknown genetic code: {genetic_code}") from None
+
+    table = {
+        "".join(codon): amino_acid
+        for codon, amino_acid in zip(product("TCAG", repeat=3), amino_acids)
+    }
+
+    for first, second in product("TCAG", repeat=2):
+        synonymous = {table[f"{first}{second}{third}"] for third in "TCAG"}
+
+        if len(synonymous) == 1:
+            table[f"{first}{second}N"] = synonymous.pop()
+
+    return table
+
+
+#: A standard translation table, including ambiguity. It is derived from the
+#: standard genetic code in :data:`GENETIC_CODES`.
+TRANSLATION_TABLE = _make_codon_table(1)
+
+#: The nucleotides that can appear in a codon lookup, in the order of their codes.
+#: Any other character is given the next code and always translates to ``X``.
+_CODON_NUCLEOTIDES = "ACGTN"
+
+
+def _make_nucleotide_codes() -> bytes:
+    """Build a :meth:`bytes.translate` table mapping nucleotides to small integer
+    codes.
+    """
+    table = bytearray([len(_CODON_NUCLEOTIDES)] * 256)
+
+    for code, nucleotide in enumerate(_CODON_NUCLEOTIDES):
+        table[ord(nucleotide)] = table[ord(nucleotide.lower())] = code
+
+    return bytes(table)
+
+
+def _make_codon_lookup(table: dict[str, str]) -> bytes:
+    """Compile a codon table into a :meth:`bytes.translate` table indexed by packed
+    codon codes.
+
+    A codon with nucleotide codes ``a``, ``b``, and ``c`` is packed as
+    ``a * 36 + b * 6 + c``, which always fits in one byte.
+    """
+    lookup = bytearray(b"X" * 256)
+
+    for codon, amino_acid in table.items():
+        a, b, c = (_CODON_NUCLEOTIDES.index(nucleotide) for nucleotide in codon)
+        lookup[a * 36 + b * 6 + c] = ord(amino_acid)
+
+    return bytes(lookup)
+
+
+@cache
+def _codon_lookup(genetic_code: int) -> bytes:
+    """Return the compiled codon lookup for an NCBI genetic code.
+
+    Each genetic code is compiled once from :func:`_make_codon_table`.
+
+    :param genetic_code: the NCBI translation table ID
+    :return: a table for :meth:`bytes.translate`
+
+    """
+    return _make_codon_lookup(_make_codon_table(genetic_code))
+
+
+@cache
+def _start_lookup(start_codons: frozenset[str]) -> bytes:
+    """Compile a set of start codons into a :meth:`bytes.translate` table.
+
+    Packed codons that are start codons map to ``1`` and all others map to ``0``.
+
+    :param start_codons: the start codons
+    :return: a table for :meth:`bytes.translate`
+
+    """
+    lookup = bytearray(256)
+
+    for codon in start_codons:
+        if len(codon) != 3 or any(nucleotide not in "ACGT" for nucleotide in codon):
+            raise ValueError(f"Invalid start codon: {codon}")
+
+        a, b, c = (_CODON_NUCLEOTIDES.index(nucleotide) for nucleotide in codon)
+        lookup[a * 36 + b * 6 + c] = 1
+
+    return bytes(lookup)
+
+
+_NUCLEOTIDE_CODES = _make_nucleotide_codes()
+
+
 def read_fasta(path: Path) -> list[tuple[str, str]]:
     """Parse the FASTA file at `path` and return its content as a
     `list` of tuples containing the header and sequence.
 
+    Use :func:`iter_fasta` or :func:`read_fasta_from_path` to avoid holding the whole
+    file in memory.
+
     :param path: the path to the FASTA file
     :return: the FASTA content
 
     """
-    if str(path)[-3:] != ".fa":
-        raise OSError("Invalid FASTA file")
+    return list(iter_fasta(path))
 
-    data = []
 
-    with open(path) as f:
-        header = None
-        seq: list[str] = []
+def _parse_fasta_record(data: bytes) -> tuple[str, str] | None:
+    """Split the content of a FASTA record, without its leading ``>``, into its
+    header and sequence.
 
-        for line in f:
-            if line[0] == ">":
-                if header:
-                    data.append((header, "".join(seq)))
+    Trailing whitespace is stripped from every line. A record with an empty header is
+    skipped if it has no other lines and is illegal otherwise.
 
-                header = line.rstrip().replace(">", "")
-                seq = []
-                continue
+    :param data: the record content
+    :return: the header and sequence, or ``None`` if the record should be skipped
 
-            if header:
-                seq.append(line.rstrip())
-                continue
+    """
+    header, _, lines = data.partition(b"\n")
+
+    header = header.decode().rstrip().replace(">", "")
 
+    if not header:
+        if lines:
+            line = lines.partition(b"\n")[0].decode()
             raise OSError(f"Illegal FASTA line: {line}")
 
-        if header:
-            data.append((header, "".join(seq)))
+        return None
 
-    return data
+    sequence = lines.replace(b"\n", b"")
 
+    if b"\r" in sequence:
+        sequence = sequence.replace(b"\r", b"")
 
-async def read_fastq_from_path(path: Path) -> AsyncIterable:
-    """Read the FASTQ file at `path` and yields its content as tuples.
+    # Checking for whitespace first keeps the common case to a few fast scans.
+    if any(character in sequence for character in b" \t\x0b\x0c"):
+        sequence = b"".join(line.rstrip() for line in lines.split(b"\n"))
 
-    Accepts both uncompressed and GZIP-compressed FASTQ
-    files.
+    return header, sequence.decode()
 
-    :param path: the path to the FASTQ File
-    :return: tuples containing the header, sequence, and quality
+
+def iter_fasta(
+    path: Path,
+    chunk_size: int = FASTA_CHUNK_SIZE,
+) -> Iterator[tuple[str, str]]:
+    """Iterate through the records in the FASTA file at `path`.
+
+    Records are yielded as soon as they are complete. Memory use is bounded by the
+    size of the largest record rather than the size of the file.
+
+    The file is read in binary chunks. Record boundaries are found by searching for
+    ``>`` at the start of a line, so sequence lines are never inspected one by one.
+
+    Accepts ``.fa``, ``.fasta``, and ``.fna`` files, uncompressed or compressed with
+    gzip, bzip2, or zstd.
+
+    This is a blocking generator. Use :func:`read_fasta_from_path` in async code.
+
+    :param path: the path to the FASTA file
+    :param chunk_size: the number of bytes to read from disk at a time
+    :return: tuples containing the header and sequence
 
     """
-    q: asyncio.Queue[tuple[str, str, str] | None] = asyncio.Queue()
+    if strip_compression_suffix(path).suffix not in FASTA_SUFFIXES:
+        raise OSError("Invalid FASTA file")
 
-    def func(path_: Path, q_: asyncio.Queue):
-        had_plus = False
-        header = None
-        seq = None
+    # The parts of the current record that have been read so far.
+    pieces: list[bytes] = []
 
-        with open(path_) as f:
-            for line in f:
-                if line == "+\n":
-                    had_plus = True
-                    continue
+    started = False
+    after_newline = True
 
-                if not had_plus:
-                    if line[0] == "@":
-                        header = line.rstrip()
-                        continue
+    with open_decompressed(path) as f:
+        for chunk in _read_chunks(f, chunk_size):
+            start = 0
+            position = 0
 
-                    seq = line.rstrip()
+            while (i := chunk.find(b">", position)) != -1:
+                position = i + 1
+
+                if not (chunk[i - 1] == ord("\n") if i else after_newline):
                     continue
 
-                if had_plus:
-                    q_.put_nowait((header, seq, line.rstrip()))
+                pieces.append(chunk[start:i])
 
-                    header = None
-                    seq = None
-                    had_plus = False
+                if started:
+                    if record := _parse_fasta_record(b"".join(pieces)):
+                        yield record
+                elif any(pieces):
+                    break
 
-            q_.put_nowait(None)
+                started = True
+                pieces = []
+                start = position
 
-    task = asyncio.create_task(asyncio.to_thread(func, path, q))
+            pieces.append(chunk[start:])
+            after_newline = chunk[-1] == ord("\n")
 
-    while True:
-        item = await q.get()
+            if not started and any(pieces):
+                break
 
-        if item is None:
-            q.task_done()
-            break
+    if started:
+        if record := _parse_fasta_record(b"".join(pieces)):
+            yield record
+    elif any(pieces):
+        line = b"".join(pieces).partition(b"\n")[0].decode()
+        raise OSError(f"Illegal FASTA line: {line}")
 
-        yield item
-        q.task_done()
 
-    await task
-    await q.join()
+class FastaIndexEntry(NamedTuple):
+    """A line from a samtools-style ``.fai`` index describing one FASTA record."""
 
+    name: str
+    """The name of the sequence: its header up to the first whitespace."""
 
-async def read_fastq_headers(path: Path) -> list[str]:
-    """Return a list of FASTQ headers for the FASTQ file located at `path`.
-    Only accepts uncompressed FASTQ files.
+    length: int
+    """The number of bases in the sequence."""
 
-    :param path: the path to the FASTQ file
-    :return: a list of FASTQ headers
+    offset: int
+    """The byte offset of the first base of the sequence in the FASTA file."""
+
+    line_bases: int
+    """The number of bases on each full sequence line."""
+
+    line_width: int
+    """The number of bytes on each full sequence line, including the line ending."""
+
+
+class FastaIndex:
+    """Random access to the sequences in an uncompressed FASTA file.
+
+    The file is described by a samtools-compatible ``.fai`` index stored next to it.
+    The index is loaded if it exists and is newer than the FASTA file. Otherwise, it
+    is built and written.
+
+    Sequences are fetched from a memory map of the FASTA file, so a lookup only reads
+    the bytes spanned by the requested range.
+
+    Example:
+    -------
+    .. code-block:: python
+
+        with FastaIndex(Path("reference.fa")) as index:
+            sequence = index.fetch("NC_003615", 100, 200)
+
+    :param path: the path to the FASTA file
+    :param save: write a newly built index to disk
 
     """
 
-    def func(path_: Path) -> list[str]:
-        had_plus = False
-        headers = []
+    def __init__(self, path: Path, save: bool = True):
+        self.path = Path(path)
+        """The path to the FASTA file."""
+
+        self.index_path = self.path.with_name(f"{self.path.name}.fai")
+        """The path to the ``.fai`` index file."""
+
+        if detect_compression(self.path):
+            raise OSError("Only uncompressed FASTA files can be indexed")
+
+        self._file = open(self.path, "rb")
+
+        self._mmap = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.fstat(self._file.fileno()).st_size
+            else None
+        )
+        """A read-only memory map of the FASTA file."""
+
+        if (
+            self.index_path.exists()
+            and self.index_path.stat().st_mtime >= self.path.stat().st_mtime
+        ):
+            self.entries = self._load()
+        else:
+            self.entries = self._build()
+
+            if save:
+                self._save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        """Close the memory map and the FASTA file."""
+        if self._mmap:
+            self._mmap.close()
+
+        self._file.close()
+
+    def fetch(self, name: str, start: int = 0, end: int | None = None) -> str:
+        """Return the bases from ``start`` up to ``end`` of the sequence ``name``.
+
+        Coordinates are zero-based and half-open, like a Python slice. They are
+        clamped to the length of the sequence.
+
+        :param name: the name of the sequence
+        :param start: the position of the first base to return
+        :param end: the position after the last base to return
+        :return: the sequence
+
+        """
+        entry = self.entries[name]
+
+        if start < 0 or (end is not None and end < 0):
+            raise ValueError("Coordinates must not be negative")
+
+        start = min(start, entry.length)
+        end = entry.length if end is None else min(end, entry.length)
+
+        if start >= end:
+            return ""
+
+        data = self._mmap[self._position(entry, start) : self._position(entry, end)]
+
+        if entry.line_width > entry.line_bases:
+            data = data.replace(b"\n", b"")
+
+            if b"\r" in data:
+                data = data.replace(b"\r", b"")
+
+        return data.decode()
+
+    @staticmethod
+    def _position(entry: FastaIndexEntry, base: int) -> int:
+        """Return the byte offset of the ``base``-th base of the sequence ``entry``."""
+        if not entry.line_bases:
+            return entry.offset
+
+        lines, column = divmod(base, entry.line_bases)
+
+        return entry.offset + lines * entry.line_width + column
+
+    def _build(self) -> dict[str, FastaIndexEntry]:
+        """Scan the FASTA file and describe every record in it."""
+        entries: dict[str, FastaIndexEntry] = {}
+
+        if self._mmap is None:
+            return entries
+
+        data = self._mmap
+        size = len(data)
+
+        if data[:1] != b">":
+            raise OSError("Invalid FASTA file")
+
+        position = 0
+
+        while position < size:
+            header_end = data.find(b"\n", position)
+            offset = size if header_end == -1 else header_end + 1
+
+            # The next record starts at the first ">" that begins a line.
+            end = offset
+
+            while (end := data.find(b">", end)) != -1 and data[end - 1] != ord("\n"):
+                end += 1
+
+            if end == -1:
+                end = size
+
+            name = data[position + 1 : offset].decode().split(maxsplit=1)
+            name = name[0] if name else ""
+
+            if name in entries:
+                raise OSError(f"Duplicate sequence name in FASTA file: {name}")
+
+            entries[name] = self._describe_record(name, offset, end)
+
+            position = end
+
+        return entries
+
+    def _describe_record(self, name: str, offset: int, end: int) -> FastaIndexEntry:
+        """Describe the sequence lines that span ``offset`` to ``end``.
+
+        Every line but the last must have the same length for offsets to be computed
+        arithmetically.
+        """
+        data = self._mmap
+
+        # Ignore trailing line endings and blank lines before the next record.
+        while end > offset and data[end - 1] in b"\r\n":
+            end -= 1
+
+        if end == offset:
+            return FastaIndexEntry(name, 0, offset, 0, 0)
+
+        first_line_end = data.find(b"\n", offset, end)
+
+        if first_line_end == -1:
+            length = end - offset
+            line_ending = data[end : end + 2]
 
-        with open(path_) as f:
+            if line_ending == b"\r\n":
+                return FastaIndexEntry(name, length, offset, length, length + 2)
+
+            if line_ending[:1] == b"\n":
+                return FastaIndexEntry(name, length, offset, length, length + 1)
+
+            return FastaIndexEntry(name, length, offset, length, length)
+
+        line_width = first_line_end + 1 - offset
+        line_bases = line_width - (2 if data[first_line_end - 1] == ord("\r") else 1)
+
+        # Each full line ends with a newline at the same column. Counting newlines
+        # makes sure there are no other line breaks in between.
+        line_ends = data[first_line_end:end:line_width]
+        newlines = sum(
+            data[i : min(i + FASTA_CHUNK_SIZE, end)].count(b"\n")
+            for i in range(offset, end, FASTA_CHUNK_SIZE)
+        )
+
+        if line_ends.count(b"\n") != len(line_ends) or newlines != len(line_ends):
+            raise OSError(f"Inconsistent line lengths in FASTA record: {name}")
+
+        last_line = end - (first_line_end + (len(line_ends) - 1) * line_width) - 1
+
+        if last_line > line_bases:
+            raise OSError(f"Inconsistent line lengths in FASTA record: {name}")
+
+        length = (len(line_ends) * line_bases) + last_line
+
+        return FastaIndexEntry(name, length, offset, line_bases, line_width)
+
+    def _load(self) -> dict[str, FastaIndexEntry]:
+        """Load the entries in the ``.fai`` file."""
+        entries = {}
+
+        with open(self.index_path) as f:
             for line in f:
-                if line == "+\n":
-                    had_plus = True
-                    continue
+                name, *values = line.rstrip("\n").split("\t")[:5]
+                entries[name] = FastaIndexEntry(name, *map(int, values))
 
-                if not had_plus and line[0] == "@":
-                    headers.append(line.rstrip())
-                    continue
+        return entries
 
-                if had_plus:
-                    had_plus = False
+    def _save(self):
+        """Write the entries to the ``.fai`` file."""
+        with open(self.index_path, "w") as f:
+            for entry in self.entries.values():
+                f.write("\t".join(map(str, entry)) + "\n")
 
-        return headers
 
-    return await asyncio.to_thread(func, path)
+def _read_chunks(f: IO[AnyStr], chunk_size: int) -> Iterator[AnyStr]:
+    """Yield blocks of ``chunk_size`` characters or bytes from the file object ``f``."""
+    while chunk := f.read(chunk_size):
+        yield chunk
 
 
-def reverse_complement(sequence: str) -> str:
-    """Calculate the reverse complement of the passed `sequence`.
+def _check_fastq_lines(lines: list[AnyStr]) -> list[AnyStr]:
+    """Make sure every four-line record in ``lines`` has a header and separator line
+    and a quality line as long as its sequence.
+
+    :param lines: the lines of the records, a multiple of four long
+    :return: the unmodified lines
+
+    The header and separator lines are each joined into one string, so their first
+    characters are checked by counting newlines followed by ``@`` or ``+``.
 
-    :param sequence: the sequence to transform
-    :return: the reverse complement
     """
-    complement = [COMPLEMENT_TABLE[s] for s in sequence.upper()]
-    complement.reverse()
+    if isinstance(lines[0], str):
+        newline, header, plus = "\n", "\n@", "\n+"
+    else:
+        newline, header, plus = b"\n", b"\n@", b"\n+"
 
-    return "".join(complement)
+    count = len(lines) // 4
 
+    if (
+        (newline + newline.join(lines[0::4])).count(header) == count
+        and (newline + newline.join(lines[2::4])).count(plus) == count
+        and list(map(len, lines[1::4])) == list(map(len, lines[3::4]))
+    ):
+        return lines
 
-def translate(sequence: str) -> str:
-    """Translate the passed nucleotide sequence to protein.
-    Substitutes _X_ for invalid codons.
+    raise OSError("Invalid FASTQ record")
 
-    :param sequence: the nucleotide sequence
-    :return: a translated protein sequence
+
+def _split_fastq_records(
+    chunks: Iterable[AnyStr],
+    validate: bool = True,
+) -> Iterator[list[AnyStr]]:
+    """Split an iterable of FASTQ file chunks into lists of complete four-line records.
+
+    Each chunk is split into lines in a single call. The lines of a record that
+    straddles the end of a chunk are carried over into the next one. Chunks can be
+    either :class:`str` or :class:`bytes`.
+
+    :param chunks: an iterable of chunks of a FASTQ file
+    :param validate: check the records with :func:`_check_fastq_lines`
+    :return: a generator of lists of lines, each a multiple of four lines long
 
     """
-    sequence = sequence.upper()
+    newline: AnyStr
+    carriage: AnyStr
+    remainder: AnyStr | None = None
 
-    protein = []
+    for chunk in chunks:
+        if remainder is None:
+            if isinstance(chunk, str):
+                newline, carriage = "\n", "\r"
+            else:
+                newline, carriage = b"\n", b"\r"
 
-    for i in range(len(sequence) // 3):
-        codon = sequence[i * 3 : (i + 1) * 3]
+            buffer = chunk
+        else:
+            buffer = remainder + chunk
 
-        # Translate to X if the codon matches no amino acid
-        # (taking into account ambiguous codons where possible)
-        protein.append(TRANSLATION_TABLE.get(codon, "X"))
+        if carriage in buffer:
+            buffer = buffer.replace(carriage + newline, newline)
 
-    return "".join(protein)
+        lines = buffer.split(newline)
+        remainder = lines.pop()
 
+        complete = len(lines) - len(lines) % 4
 
-def find_orfs(sequence: str) -> list[dict]:
-    """Return all ORFs for the nucelotide sequence.
-    No ORFs will be returned for sequences shorter than 300 bp
-    Only ORFs 100 residues long or greater will be returned.
+        if complete < len(lines):
+            remainder = newline.join([*lines[complete:], remainder])
+            del lines[complete:]
 
-    :param sequence:
-    :return: a list of ORFs and metadata
+        if lines:
+            yield _check_fastq_lines(lines) if validate else lines
+
+    # The last record may not end with a newline. Blank lines at the end of the file
+    # are ignored unless they are the empty sequence and quality of the last record.
+    if remainder and remainder.strip():
+        lines = remainder.split(newline)
+
+        if len(lines) != 4:
+            raise OSError("Truncated FASTQ record")
+
+        yield _check_fastq_lines(lines) if validate else lines
+
+
+def _iter_fastq_lines(
+    path: Path,
+    chunk_size: int,
+    processes: int,
+    validate: bool = True,
+) -> Iterator[list[str]]:
+    """Yield lists of the lines of complete records in the FASTQ file at `path`.
+
+    Each binary chunk is decoded in one call before it is split into lines.
     """
-    orfs = []
+    with open_decompressed(path, processes) as f:
+        yield from _split_fastq_records(
+            _decode_chunks(_read_chunks(f, chunk_size)),
+            validate,
+        )
 
-    sequence_length = len(sequence)
 
-    # Only look for ORFs if the contig is at least 300 nucleotides long.
-    if sequence_length > 300:
-        # Looks at both forward (+) and reverse (-) strands.
-        for strand, nuc in [(+1, sequence), (-1, reverse_complement(sequence))]:
-            # Look in all three translation frames.
-            for frame in range(3):
-                translation = translate(nuc[frame:])
-                translation_length = len(translation)
+def _decode_column(lines: list[bytes], column: int) -> list[str]:
+    """Decode one of the four lines of every record in a list of undecoded FASTQ
+    lines in one call.
 
-                aa_start = 0
+    :param lines: the lines of complete records
+    :param column: 0 for headers, 1 for sequences, 2 for separators, 3 for qualities
+    :return: the decoded lines
 
-                # Extract ORFs.
-                while aa_start < translation_length:
-                    aa_end = translation.find("*", aa_start)
+    """
+    return b"\n".join(lines[column::4]).decode().split("\n")
 
-                    if aa_end == -1:
-                        aa_end = translation_length
-                    if aa_end - aa_start >= 100:
-                        if strand == 1:
-                            start = frame + aa_start * 3
-                            end = min(sequence_length, frame + aa_end * 3 + 3)
-                        else:
-                            start = sequence_length - frame - aa_end * 3 - 3
-                            end = sequence_length - frame - aa_start * 3
-
-                        orfs.append(
-                            {
-                                "pro": str(translation[aa_start:aa_end]),
-                                "nuc": str(nuc[start:end]),
-                                "frame": frame,
-                                "strand": strand,
-                                "pos": (start, end),
-                            },
-                        )
 
-                    aa_start = aa_end + 1
+def iter_fastq(
+    path: Path,
+    header: bool = True,
+    sequence: bool = True,
+    quality: bool = True,
+    chunk_size: int = FASTQ_CHUNK_SIZE,
+    processes: int = 1,
+) -> Iterator[tuple[str | None, str | None, str | None]]:
+    """Iterate through the records in the FASTQ file at `path`.
 
-    return orfs
+    The file is read in binary chunks that are split into four-line records in a
+    single call, instead of inspecting the file line by line. Fields that are not
+    requested are ``None`` in the yielded tuples.
+
+    When only headers are requested, the chunks are split without decoding and only
+    the header lines are decoded, in one call per chunk. Otherwise, each chunk is
+    decoded in one call before it is split. Decoding long sequence and quality lines
+    separately is slower than decoding the whole chunk once.
+
+    Compressed files are decompressed as they are read using
+    :func:`~virtool_core.utils.open_decompressed`.
+
+    This is a blocking generator. Use :func:`read_fastq_from_path` in async code.
+
+    :param path: the path to the FASTQ file
+    :param header: whether to return the header lines
+    :param sequence: whether to return the sequence lines
+    :param quality: whether to return the quality lines
+    :param chunk_size: the number of bytes to read from disk at a time
+    :param processes: the number of processes available for decompression
+    :return: tuples containing the header, sequence, and quality
+
+    """
+    if header and not sequence and not quality:
+        for lines in iter_fastq_binary_lines(path, processes, chunk_size):
+            headers = _decode_column(lines, 0)
+            count = len(headers)
+
+            yield from zip(headers, repeat(None, count), repeat(None, count))
+
+        return
+
+    for lines in _iter_fastq_lines(path, chunk_size, processes):
+        count = len(lines) // 4
+
+        yield from zip(
+            lines[0::4] if header else repeat(None, count),
+            lines[1::4] if sequence else repeat(None, count),
+            lines[3::4] if quality else repeat(None, count),
+        )
+
+
+def format_fastq(
+    records: Iterable[tuple[str, str, str]],
+    batch_size: int = FASTQ_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Format FASTQ records as encoded chunks of FASTQ text.
+
+    Records are tuples of header, sequence, and quality, as yielded by
+    :func:`iter_fastq`. Headers should include the leading ``@``. Each chunk contains
+    up to ``batch_size`` records so it can be passed straight to a streaming
+    compressor like :func:`~virtool_core.utils.compress_chunks`.
+
+    :param records: the records to format
+    :param batch_size: the number of records in each chunk
+    :return: the encoded FASTQ chunks
+
+    """
+    records = iter(records)
+
+    while batch := list(islice(records, batch_size)):
+        yield "".join(
+            f"{header}\n{sequence}\n+\n{quality}\n"
+            for header, sequence, quality in batch
+        ).encode()
+
+
+def format_fasta(
+    records: Iterable[tuple[str, str]],
+    batch_size: int = FASTQ_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Format FASTA records as encoded chunks of FASTA text.
+
+    Records are tuples of header and sequence, as yielded by :func:`iter_fasta`.
+    Headers should not include the leading ``>``. Sequences are written on a single
+    line.
+
+    :param records: the records to format
+    :param batch_size: the number of records in each chunk
+    :return: the encoded FASTA chunks
+
+    """
+    records = iter(records)
+
+    while batch := list(islice(records, batch_size)):
+        yield "".join(f">{header}\n{sequence}\n" for header, sequence in batch).encode()
+
+
+def iter_fastq_binary_lines(
+    path: Path,
+    processes: int = 1,
+    chunk_size: int = FASTQ_CHUNK_SIZE,
+    validate: bool = True,
+) -> Iterator[list[bytes]]:
+    """Iterate through the undecoded lines of the FASTQ file at `path`.
+
+    Each item is a list of the lines of complete four-line records as :class:`bytes`.
+    Records are validated like in :func:`iter_fastq`, but no line is decoded. Use this
+    to pick out one field of every record without creating strings for the others.
+
+    When ``validate`` is not set, the header, separator, and quality lines are not
+    checked. The file is still split into four-line records and a truncated last
+    record still raises :class:`OSError`.
+
+    :param path: the path to the FASTQ file
+    :param processes: the number of processes available for decompression
+    :param chunk_size: the number of bytes to read from disk at a time
+    :param validate: check that every record is well-formed
+    :return: lists of lines, each a multiple of four lines long
+
+    """
+    with open_decompressed(path, processes) as f:
+        yield from _split_fastq_records(_read_chunks(f, chunk_size), validate)
+
+
+def iter_fastq_headers(
+    path: Path,
+    processes: int = 1,
+    validate: bool = False,
+) -> Iterator[str]:
+    """Iterate through the headers in the FASTQ file at `path`.
+
+    The file is scanned in binary mode and only the header lines are decoded. Headers
+    are yielded lazily, so checking for duplicate names or sampling headers doesn't
+    require a list of every header in the file.
+
+    Records are not validated by default, which makes scanning about a quarter faster.
+    Set ``validate`` to check every record like :func:`iter_fastq` does.
+
+    :param path: the path to the FASTQ file
+    :param processes: the number of processes available for decompression
+    :param validate: check that every record is well-formed
+    :return: the header lines
+
+    """
+    for lines in iter_fastq_binary_lines(path, processes, validate=validate):
+        yield from _decode_column(lines, 0)
+
+
+def count_fastq_records(path: Path, processes: int = 1) -> int:
+    """Count the records in the FASTQ file at `path`.
+
+    Only newlines are counted, so no lines are split out or decoded and the count is
+    limited by how fast the file can be read. Records are not validated. Blank lines
+    at the end of the file are ignored in the same way as by :func:`iter_fastq`.
+
+    :param path: the path to the FASTQ file
+    :param processes: the number of processes available for decompression
+    :return: the number of records
+
+    """
+    newlines = 0
+    tail = b""
+
+    with open_decompressed(path, processes) as f:
+        for chunk in _read_chunks(f, FASTA_CHUNK_SIZE):
+            newlines += chunk.count(b"\n")
+            tail = tail[-FASTQ_CHUNK_SIZE:] + chunk[-FASTQ_CHUNK_SIZE:]
+
+    # Find the lines after the last complete group of four, including a last line
+    # without a newline.
+    start = len(tail)
+
+    for _ in range(newlines % 4 + 1):
+        start = tail.rfind(b"\n", 0, start)
+
+        if start == -1:
+            break
+
+    remainder = tail[start + 1 :]
+
+    if not remainder.strip():
+        return newlines // 4
+
+    if remainder.count(b"\n") != 3:
+        raise OSError("Truncated FASTQ record")
+
+    return newlines // 4 + 1
+
+
+def iter_fastq_batches(
+    path: Path,
+    batch_size: int = FASTQ_BATCH_SIZE,
+    processes: int = 1,
+) -> Iterator[list[tuple[str, str, str]]]:
+    """Iterate through the records in the FASTQ file at `path` in lists of
+    ``batch_size`` records.
+
+    The last batch may be shorter than ``batch_size``.
+
+    :param path: the path to the FASTQ file
+    :param batch_size: the number of records in each batch
+    :param processes: the number of processes available for decompression
+    :return: lists of tuples containing the header, sequence, and quality
+
+    """
+    yield from _batch_fastq_lines(
+        _iter_fastq_lines(path, FASTQ_CHUNK_SIZE, processes),
+        batch_size,
+    )
+
+
+def _batch_fastq_lines(
+    lines: Iterable[list[str]],
+    batch_size: int,
+) -> Iterator[list[tuple[str, str, str]]]:
+    """Regroup lists of FASTQ lines into lists of ``batch_size`` record tuples."""
+    batch: list[tuple[str, str, str]] = []
+
+    for chunk in lines:
+        batch.extend(zip(chunk[0::4], chunk[1::4], chunk[3::4]))
+
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            del batch[:batch_size]
+
+    if batch:
+        yield batch
+
+
+@cache
+def _nucleotide_mask(nucleotides: str) -> bytes:
+    """Return a :meth:`bytes.translate` table that maps ``nucleotides`` in either case
+    to ``1`` and every other byte to ``0``.
+    """
+    mask = bytearray(256)
+
+    for nucleotide in (nucleotides.upper() + nucleotides.lower()).encode():
+        mask[nucleotide] = 1
+
+    return bytes(mask)
+
+
+class ReadBatch:
+    """A batch of FASTQ reads stored in columns.
+
+    All sequences are concatenated into one :class:`bytes` buffer and all qualities
+    into another. ``offsets`` holds the start of every read in both buffers followed
+    by the end of the last read, like an Arrow string array.
+
+    The buffers support the buffer protocol, so they can be wrapped without copying,
+    for example with ``numpy.frombuffer(batch.sequences, dtype=numpy.uint8)`` and
+    ``numpy.frombuffer(batch.offsets, dtype=numpy.uint64)``. The methods here work on
+    whole buffers in C without needing NumPy.
+
+    """
+
+    __slots__ = ("headers", "offsets", "qualities", "sequences")
+
+    def __init__(
+        self,
+        headers: list[str],
+        sequences: bytes,
+        qualities: bytes,
+        offsets: array,
+    ):
+        #: The header line of each read.
+        self.headers = headers
+
+        #: The concatenated sequences of the reads.
+        self.sequences = sequences
+
+        #: The concatenated qualities of the reads.
+        self.qualities = qualities
+
+        #: The offset of each read in ``sequences`` and ``qualities`` and the total
+        #: length of the buffers.
+        self.offsets = offsets
+
+    @classmethod
+    def from_lines(cls, lines: list[bytes]) -> "ReadBatch":
+        """Create a batch from the undecoded lines of complete FASTQ records.
+
+        :param lines: the lines of the records, a multiple of four long
+        :return: a new batch
+
+        """
+        sequences = lines[1::4]
+
+        return cls(
+            _decode_column(lines, 0) if lines else [],
+            b"".join(sequences),
+            b"".join(lines[3::4]),
+            array("Q", accumulate(map(len, sequences), initial=0)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> tuple[str, str, str]:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("ReadBatch index out of range")
+
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+
+        return (
+            self.headers[index],
+            self.sequences[start:end].decode(),
+            self.qualities[start:end].decode(),
+        )
+
+    def __iter__(self) -> Iterator[tuple[str, str, str]]:
+        """Yield the reads as tuples like those from :func:`iter_fastq_batches`."""
+        offsets = self.offsets
+        sequences = self.sequences.decode()
+        qualities = self.qualities.decode()
+
+        for header, start, end in zip(self.headers, offsets, offsets[1:]):
+            yield header, sequences[start:end], qualities[start:end]
+
+    @property
+    def lengths(self) -> array:
+        """The length of each read."""
+        return array("Q", map(operator.sub, self.offsets[1:], self.offsets))
+
+    def length_histogram(self) -> Counter[int]:
+        """Return the number of reads of each length.
+
+        :return: read counts keyed by length
+
+        """
+        return Counter(self.lengths)
+
+    def count(self, nucleotides: str) -> int:
+        """Return the number of times any of ``nucleotides`` appears in the batch.
+
+        Matching is case-insensitive. The matching bytes are translated to ``1`` and
+        all others to ``0``, and the set bits are counted in one big integer.
+
+        :param nucleotides: the nucleotides to count, such as ``"GC"``
+        :return: the total count
+
+        """
+        masked = self.sequences.translate(_nucleotide_mask(nucleotides))
+        return int.from_bytes(masked, "little").bit_count()
+
+    @property
+    def gc(self) -> float:
+        """The GC content of the batch as a fraction of the called bases."""
+        called = self.count("ACGT")
+        return self.count("GC") / called if called else 0.0
+
+
+def iter_fastq_read_batches(
+    path: Path,
+    batch_size: int = FASTQ_BATCH_SIZE,
+    processes: int = 1,
+) -> Iterator[ReadBatch]:
+    """Iterate through the records in the FASTQ file at `path` as columnar
+    :class:`ReadBatch` objects of ``batch_size`` reads.
+
+    The sequence and quality lines are never decoded or turned into tuples. The last
+    batch may be shorter than ``batch_size``.
+
+    :param path: the path to the FASTQ file
+    :param batch_size: the number of reads in each batch
+    :param processes: the number of processes available for decompression
+    :return: batches of reads
+
+    """
+    size = batch_size * 4
+    pending: list[bytes] = []
+
+    for lines in iter_fastq_binary_lines(path, processes):
+        pending.extend(lines)
+
+        while len(pending) >= size:
+            yield ReadBatch.from_lines(pending[:size])
+            del pending[:size]
+
+    if pending:
+        yield ReadBatch.from_lines(pending)
+
+
+def _find_fastq_record(f: IO[bytes], offset: int) -> int:
+    """Return the offset of the first FASTQ record that starts at or after ``offset``
+    in the binary file ``f``.
+
+    A line is taken to be a header when it starts with ``@``, the line two below it
+    starts with ``+``, and the lines between are the same length. A quality line
+    starting with ``@`` is never followed two lines later by a ``+`` line, so it can't
+    be mistaken for a header.
+
+    :param f: a binary file object
+    :param offset: the offset to search from
+    :return: the offset of the record or the end of the file if there isn't one
+
+    """
+    if offset == 0:
+        return 0
+
+    f.seek(offset - 1)
+
+    window = b""
+    read_size = FASTQ_CHUNK_SIZE
+
+    while True:
+        data = f.read(read_size)
+        window += data
+
+        lines = window.split(b"\n")
+
+        # The first line is the one containing the byte before ``offset``. It is
+        # either a newline or part of a line that started before ``offset``.
+        position = offset + len(lines[0])
+
+        # The last line can't be checked until it is complete.
+        complete = len(lines) if not data else len(lines) - 1
+
+        for index in range(1, complete - 3):
+            if (
+                lines[index].startswith(b"@")
+                and lines[index + 2].startswith(b"+")
+                and len(lines[index + 1].rstrip(b"\r"))
+                == len(lines[index + 3].rstrip(b"\r"))
+            ):
+                return position
+
+            position += len(lines[index]) + 1
+
+        if not data:
+            return offset - 1 + len(window)
+
+        read_size *= 2
+
+
+def _shard_fastq(path: Path, shards: int) -> list[tuple[int, int]]:
+    """Split the uncompressed FASTQ file at ``path`` into ``shards`` byte ranges that
+    each start and end on a record boundary.
+
+    :param path: the path to the FASTQ file
+    :param shards: the number of ranges to target
+    :return: the start and end offsets of each non-empty range
+
+    """
+    size = path.stat().st_size
+
+    with open(path, "rb") as f:
+        offsets = [0]
+
+        for shard in range(1, shards):
+            offsets.append(
+                max(offsets[-1], _find_fastq_record(f, size * shard // shards)),
+            )
+
+    offsets.append(size)
+
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if start < end]
+
+
+def _read_range(
+    f: IO[bytes],
+    start: int,
+    end: int,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    """Yield the bytes between ``start`` and ``end`` in ``f`` in chunks."""
+    f.seek(start)
+    remaining = end - start
+
+    while remaining > 0 and (data := f.read(min(chunk_size, remaining))):
+        remaining -= len(data)
+        yield data
+
+
+def _decode_chunks(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode UTF-8 chunks that may split multibyte characters."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def _map_fastq_range(
+    path: Path,
+    start: int,
+    end: int,
+    mapper: Callable[[Iterator], T],
+    binary: bool,
+    validate: bool,
+) -> T:
+    """Apply ``mapper`` to the records between ``start`` and ``end`` in the
+    uncompressed FASTQ file at ``path``.
+    """
+    with open(path, "rb") as f:
+        chunks = _read_range(f, start, end, FASTQ_CHUNK_SIZE)
+
+        if binary:
+            return mapper(_split_fastq_records(chunks, validate))
+
+        return mapper(
+            _batch_fastq_lines(
+                _split_fastq_records(_decode_chunks(chunks), validate),
+                FASTQ_BATCH_SIZE,
+            ),
+        )
+
+
+def map_reduce_fastq(
+    path: Path,
+    mapper: Callable[[Iterator], T],
+    reducer: Callable[[T, T], T],
+    processes: int = 1,
+    min_shard_size: int = FASTQ_MIN_SHARD_SIZE,
+    binary: bool = False,
+    validate: bool = True,
+) -> T:
+    """Map ``mapper`` over shards of the FASTQ file at `path` in parallel and reduce
+    the results with ``reducer``.
+
+    Uncompressed files are split into up to ``processes`` byte ranges of at least
+    ``min_shard_size`` bytes. Each range is moved forward to the start of the next
+    record and parsed in its own process. ``mapper`` is called with an iterator of
+    record batches, like those yielded by :func:`iter_fastq_batches`, for each range.
+    The results are passed to ``reducer`` in file order.
+
+    When ``binary`` is set, ``mapper`` is instead called with an iterator of lists of
+    the undecoded lines of complete records, as yielded by
+    :func:`iter_fastq_binary_lines`. This skips decoding lines the mapper doesn't need.
+
+    Records are only checked for well-formedness when ``validate`` is set. Turn it off
+    when the mapper only reads headers or counts records.
+
+    Compressed files can't be split, so ``mapper`` is called once for the whole file
+    and ``processes`` is used for decompression instead.
+
+    ``mapper`` and ``reducer`` must be picklable, such as module-level functions.
+
+    This is a blocking function.
+
+    :param path: the path to the FASTQ file
+    :param mapper: a function that turns an iterator of record batches into a result
+    :param reducer: a function that combines two results
+    :param processes: the number of processes to use
+    :param min_shard_size: the smallest byte range to parse in its own process
+    :param binary: pass undecoded lines to ``mapper`` instead of record batches
+    :param validate: check that every record is well-formed
+    :return: the reduced result
+
+    """
+    path = Path(path)
+    shards = 1
+
+    if detect_compression(path) is None:
+        shards = min(processes, -(-path.stat().st_size // max(min_shard_size, 1)))
+
+    if shards <= 1:
+        if binary:
+            return mapper(iter_fastq_binary_lines(path, processes, validate=validate))
+
+        return mapper(
+            _batch_fastq_lines(
+                _iter_fastq_lines(path, FASTQ_CHUNK_SIZE, processes, validate),
+                FASTQ_BATCH_SIZE,
+            ),
+        )
+
+    ranges = _shard_fastq(path, shards)
+
+    with ProcessPoolExecutor(len(ranges)) as executor:
+        return reduce(
+            reducer,
+            executor.map(
+                _map_fastq_range,
+                repeat(path),
+                *zip(*ranges),
+                repeat(mapper),
+                repeat(binary),
+                repeat(validate),
+            ),
+        )
+
+
+def _collect_fastq_headers(line_lists: Iterator[list[bytes]]) -> list[str]:
+    """Return the headers of the records in lists of undecoded FASTQ lines."""
+    headers = []
+
+    for lines in line_lists:
+        headers.extend(_decode_column(lines, 0))
+
+    return headers
+
+
+async def _iter_in_thread(
+    func: Callable[..., Iterator[T]],
+    *args,
+    maxsize: int = MAX_QUEUED_BATCHES,
+) -> AsyncIterator[T]:
+    """Run the blocking generator function ``func`` in a worker thread and yield its
+    items in the event loop.
+
+    Items are passed through a queue holding at most ``maxsize`` items. When the queue
+    is full, the worker thread blocks until the consumer catches up. Exceptions raised
+    in the worker thread are re-raised in the consumer. If the consumer stops early,
+    the worker thread is stopped before this generator exits.
+
+    :param func: a generator function to run in the thread
+    :param args: arguments to pass to ``func``
+    :param maxsize: the maximum number of items to hold in the queue
+    :return: the items yielded by ``func``
+
+    """
+    loop = asyncio.get_running_loop()
+    q: asyncio.Queue = asyncio.Queue(maxsize)
+    stopped = threading.Event()
+    done = object()
+
+    def put(item) -> None:
+        future = asyncio.run_coroutine_threadsafe(q.put(item), loop)
+
+        while not stopped.is_set() and not loop.is_closed():
+            try:
+                return future.result(timeout=0.1)
+            except TimeoutError:
+                continue
+
+        future.cancel()
+
+    def worker() -> None:
+        try:
+            for item in func(*args):
+                if stopped.is_set():
+                    return
+
+                put(item)
+        finally:
+            put(done)
+
+    task = asyncio.create_task(asyncio.to_thread(worker))
+
+    try:
+        while (item := await q.get()) is not done:
+            yield item
+    finally:
+        stopped.set()
+        await task
+
+
+async def read_fastq_batches_from_path(
+    path: Path,
+    batch_size: int = FASTQ_BATCH_SIZE,
+    max_batches: int = MAX_QUEUED_BATCHES,
+    processes: int = 1,
+    columnar: bool = False,
+) -> AsyncIterable[list[tuple[str, str, str]] | ReadBatch]:
+    """Read the FASTQ file at `path` and yield its records in lists of
+    ``batch_size`` records.
+
+    The file is parsed in a worker thread. Each batch is a single handoff to the event
+    loop. At most ``max_batches`` batches are held in memory, so a slow consumer
+    pauses the reader instead of letting the file pile up in memory.
+
+    When ``columnar`` is set, batches are yielded as :class:`ReadBatch` objects
+    instead of lists of tuples.
+
+    :param path: the path to the FASTQ file
+    :param batch_size: the number of records in each batch
+    :param max_batches: the number of batches the reader can get ahead of the consumer
+    :param processes: the number of processes available for decompression
+    :param columnar: yield :class:`ReadBatch` objects
+    :return: lists of tuples containing the header, sequence, and quality
+
+    """
+    async with aclosing(
+        _iter_in_thread(
+            iter_fastq_read_batches if columnar else iter_fastq_batches,
+            path,
+            batch_size,
+            processes,
+            maxsize=max_batches,
+        ),
+    ) as batches:
+        async for batch in batches:
+            yield batch
+
+
+def _check_mates(
+    batch_1: list[tuple[str, str, str]],
+    batch_2: list[tuple[str, str, str]],
+):
+    """Make sure the records in two batches of paired reads are mates.
+
+    The headers of each batch are joined and compared as one string. If they differ,
+    both are stripped of their mate suffixes with one regular expression substitution
+    and compared again. Per-read stems are only built to report a mismatch.
+
+    :param batch_1: a batch of records from the first file
+    :param batch_2: a batch of records from the second file
+
+    """
+    if len(batch_1) != len(batch_2):
+        raise OSError("Paired FASTQ files contain different numbers of reads")
+
+    stems_1 = "\n".join([record[0] for record in batch_1])
+    stems_2 = "\n".join([record[0] for record in batch_2])
+
+    if stems_1 == stems_2:
+        return
+
+    stems_1 = MATE_SUFFIX_PATTERN.sub("", stems_1)
+    stems_2 = MATE_SUFFIX_PATTERN.sub("", stems_2)
+
+    if stems_1 != stems_2:
+        for stem_1, stem_2, record_1, record_2 in zip(
+            stems_1.split("\n"),
+            stems_2.split("\n"),
+            batch_1,
+            batch_2,
+        ):
+            if stem_1 != stem_2:
+                raise OSError(
+                    f"Mate headers do not match: {record_1[0]} and {record_2[0]}",
+                )
+
+
+async def read_paired_fastq_batches_from_path(
+    path_1: Path,
+    path_2: Path,
+    batch_size: int = FASTQ_BATCH_SIZE,
+    max_batches: int = MAX_QUEUED_BATCHES,
+    processes: int = 1,
+) -> AsyncIterable[tuple[list[tuple[str, str, str]], list[tuple[str, str, str]]]]:
+    """Read a pair of FASTQ files and yield batches of mates.
+
+    Each file is parsed in its own worker thread using
+    :func:`read_fastq_batches_from_path`. Every yielded pair of batches contains
+    mates at the same positions. The mate header stems are checked for each batch
+    before it is yielded, so files that are out of sync fail at the first bad batch.
+
+    :param path_1: the path to the first FASTQ file of the pair
+    :param path_2: the path to the second FASTQ file of the pair
+    :param batch_size: the number of records in each batch
+    :param max_batches: the number of batches the readers can get ahead of the consumer
+    :param processes: the number of processes available for decompression
+    :return: tuples of matching batches from the first and second files
+
+    """
+    async with aclosing(
+        read_fastq_batches_from_path(path_1, batch_size, max_batches, processes),
+    ) as batches_1, aclosing(
+        read_fastq_batches_from_path(path_2, batch_size, max_batches, processes),
+    ) as batches_2:
+        while True:
+            # Exceptions are collected so neither reader is still running when the
+            # other is closed.
+            batch_1, batch_2 = await asyncio.gather(
+                anext(batches_1, None),
+                anext(batches_2, None),
+                return_exceptions=True,
+            )
+
+            for result in (batch_1, batch_2):
+                if isinstance(result, BaseException):
+                    raise result
+
+            if batch_1 is None and batch_2 is None:
+                return
+
+            if batch_1 is None or batch_2 is None:
+                raise OSError("Paired FASTQ files contain different numbers of reads")
+
+            _check_mates(batch_1, batch_2)
+
+            yield batch_1, batch_2
+
+
+async def read_fastq_from_path(path: Path, processes: int = 1) -> AsyncIterable:
+    """Read the FASTQ file at `path` and yields its content as tuples.
+
+    Accepts uncompressed and gzip-, bzip2-, or zstd-compressed FASTQ
+    files.
+
+    Records are read in batches using :func:`read_fastq_batches_from_path`. Consume
+    batches directly when per-record iteration is too slow.
+
+    :param path: the path to the FASTQ File
+    :param processes: the number of processes available for decompression
+    :return: tuples containing the header, sequence, and quality
+
+    """
+    async with aclosing(
+        read_fastq_batches_from_path(path, processes=processes),
+    ) as batches:
+        async for batch in batches:
+            for record in batch:
+                yield record
+
+
+async def read_fastq_headers(path: Path, processes: int = 1) -> list[str]:
+    """Return a list of FASTQ headers for the FASTQ file located at `path`.
+    Accepts uncompressed and gzip-, bzip2-, or zstd-compressed FASTQ files.
+
+    Uncompressed files are split between ``processes`` processes using
+    :func:`map_reduce_fastq`. Only header lines are decoded and records are not
+    validated. Use
+    :func:`iter_fastq_headers` to avoid building the list and
+    :func:`count_fastq_records` when only the number of headers is needed.
+
+    :param path: the path to the FASTQ file
+    :param processes: the number of processes available for parsing or decompression
+    :return: a list of FASTQ headers
+
+    """
+    return await asyncio.to_thread(
+        map_reduce_fastq,
+        path,
+        _collect_fastq_headers,
+        operator.iadd,
+        processes,
+        FASTQ_MIN_SHARD_SIZE,
+        True,
+        False,
+    )
+
+
+async def read_fasta_from_path(path: Path) -> AsyncIterable[tuple[str, str]]:
+    """Read the FASTA file at `path` and yield its records as tuples.
+
+    The file is parsed in a worker thread using :func:`iter_fasta`. Only a few records
+    are held in memory at a time.
+
+    :param path: the path to the FASTA file
+    :return: tuples containing the header and sequence
+
+    """
+    async with aclosing(_iter_in_thread(iter_fasta, path)) as records:
+        async for record in records:
+            yield record
+
+
+def reverse_complement(sequence: str) -> str:
+    """Calculate the reverse complement of the passed `sequence`.
+
+    All IUPAC nucleotide codes are supported. Lowercase bases are complemented to
+    uppercase.
+
+    :param sequence: the sequence to transform
+    :return: the reverse complement
+    """
+    return reverse_complement_bytes(sequence.encode("ascii")).decode()
+
+
+def reverse_complement_bytes(sequence: bytes | bytearray) -> bytes | bytearray:
+    """Calculate the reverse complement of a sequence stored as bytes.
+
+    :param sequence: the sequence to transform
+    :return: the reverse complement, the same type as ``sequence``
+    """
+    complement = sequence.translate(_COMPLEMENT_TRANSLATION)
+
+    if b"\x00" in complement:
+        raise ValueError("Sequence contains invalid characters")
+
+    return complement[::-1]
+
+
+def reverse_complement_inplace(sequence: bytearray) -> None:
+    """Replace the contents of ``sequence`` with its reverse complement.
+
+    Use this when the caller owns the buffer and does not need the original sequence.
+    The buffer is left unchanged if it contains invalid characters.
+
+    :param sequence: the sequence to transform
+    """
+    complement = sequence.translate(_COMPLEMENT_TRANSLATION)
+
+    if b"\x00" in complement:
+        raise ValueError("Sequence contains invalid characters")
+
+    sequence[::-1] = complement
+
+
+def _encode_codons(sequence: str | bytes) -> bytes:
+    """Convert a nucleotide sequence to the codes used by the codon lookups."""
+    if isinstance(sequence, str):
+        sequence = sequence.encode("ascii")
+
+    return sequence.translate(_NUCLEOTIDE_CODES)
+
+
+def _translate_frame(
+    columns: tuple[bytes, bytes, bytes],
+    frame: int,
+    lookup: bytes,
+) -> bytes:
+    """Translate one reading frame of an encoded sequence.
+
+    ``columns`` holds the codes at every third position of the sequence, starting at
+    positions 0, 1, and 2. The three codon positions of the frame are combined in one
+    step by treating each run of codes as a big integer with one code per byte. The
+    packed codons never overflow a byte, so nothing carries between codons.
+    """
+    count = max(0, (sum(map(len, columns)) - frame) // 3)
+
+    packed = 0
+
+    for position, factor in zip(range(frame, frame + 3), (36, 6, 1)):
+        offset = position // 3
+        codes = columns[position % 3][offset : offset + count]
+        packed += int.from_bytes(codes, "big") * factor
+
+    return packed.to_bytes(count, "big").translate(lookup)
+
+
+def translate(sequence: str | bytes, genetic_code: int = 1) -> str:
+    """Translate the passed nucleotide sequence to protein.
+    Substitutes _X_ for invalid codons.
+
+    Codons are looked up in a precompiled table without slicing the sequence into
+    individual codons. Both :class:`str` and :class:`bytes` sequences are accepted.
+
+    :param sequence: the nucleotide sequence
+    :param genetic_code: the NCBI translation table ID to use
+    :return: a translated protein sequence
+
+    """
+    codes = _encode_codons(sequence)
+
+    return _translate_frame(
+        (codes[0::3], codes[1::3], codes[2::3]),
+        0,
+        _codon_lookup(genetic_code),
+    ).decode()
+
+
+def translate_frames(
+    sequence: str | bytes,
+    genetic_code: int = 1,
+) -> tuple[str, str, str]:
+    """Translate all three forward reading frames of a nucleotide sequence.
+
+    The sequence is encoded and split into codon positions once and shared by all
+    three frames.
+
+    :param sequence: the nucleotide sequence
+    :param genetic_code: the NCBI translation table ID to use
+    :return: the translations of the frames starting at positions 0, 1, and 2
+
+    """
+    codes = _encode_codons(sequence)
+    columns = (codes[0::3], codes[1::3], codes[2::3])
+    lookup = _codon_lookup(genetic_code)
+
+    return (
+        _translate_frame(columns, 0, lookup).decode(),
+        _translate_frame(columns, 1, lookup).decode(),
+        _translate_frame(columns, 2, lookup).decode(),
+    )
+
+
+def translate_many(
+    sequences: Iterable[str | bytes],
+    genetic_code: int = 1,
+) -> list[str]:
+    """Translate many nucleotide sequences in a single pass.
+
+    The sequences are padded to whole codons and joined so the codon lookup runs once
+    over the whole batch. This avoids the per-call overhead of :func:`translate` when
+    translating many short sequences.
+
+    :param sequences: the nucleotide sequences
+    :param genetic_code: the NCBI translation table ID to use
+    :return: the translated protein sequences in the same order
+
+    """
+    encoded = [_encode_codons(sequence) for sequence in sequences]
+
+    padding = bytes([len(_CODON_NUCLEOTIDES)] * 2)
+    joined = b"".join(codes + padding[: -len(codes) % 3] for codes in encoded)
+
+    protein = _translate_frame(
+        (joined[0::3], joined[1::3], joined[2::3]),
+        0,
+        _codon_lookup(genetic_code),
+    ).decode()
+
+    proteins = []
+    position = 0
+
+    for codes in encoded:
+        proteins.append(protein[position : position + len(codes) // 3])
+        position += -(-len(codes) // 3)
+
+    return proteins
+
+
+_ORF_KEYS = ("pro", "nuc", "frame", "strand", "pos")
+
+
+class ORF(Mapping):
+    """An open reading frame found by :func:`find_orfs`.
+
+    Only coordinates are stored. The nucleotide and protein sequences are sliced and
+    translated from the strand the ORF was found on each time they are accessed, so
+    many ORFs on the same contig share one copy of its sequence.
+
+    ORFs behave as read-only mappings with the keys ``pro``, ``nuc``, ``frame``,
+    ``strand``, and ``pos`` and compare equal to the equivalent :class:`dict`. They
+    are not :class:`dict` instances, so use :meth:`to_dict` before passing them to
+    :func:`json.dumps` or other serializers.
+
+    ORFs that wrap around the origin of a circular sequence have spans that end past
+    the end of the source. The part past the end is read from the start of the source.
+
+    """
+
+    __slots__ = (
+        "_nuc_span",
+        "_source",
+        "_span",
+        "frame",
+        "genetic_code",
+        "pos",
+        "strand",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        frame: int,
+        strand: int,
+        pos: tuple[int, int],
+        span: tuple[int, int],
+        nuc_span: tuple[int, int],
+        genetic_code: int = 1,
+    ):
+        #: The sequence of the strand the ORF was found on.
+        self._source = source
+
+        #: The slice of ``_source`` holding the translated codons. The end can be
+        #: past the end of ``_source`` for ORFs that wrap around the origin.
+        self._span = span
+
+        #: The slice of ``_source`` returned as ``nuc``.
+        self._nuc_span = nuc_span
+
+        #: The NCBI translation table ID used to translate the ORF.
+        self.genetic_code = genetic_code
+
+        #: The translation frame the ORF was found in.
+        self.frame = frame
+
+        #: The strand the ORF was found on: ``1`` or ``-1``.
+        self.strand = strand
+
+        #: The start and end of the ORF. The end is less than the start for ORFs that
+        #: wrap around the origin of a circular sequence.
+        self.pos = pos
+
+    def __getitem__(self, key: str):
+        if key not in _ORF_KEYS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_ORF_KEYS)
+
+    def __len__(self) -> int:
+        return len(_ORF_KEYS)
+
+    def __repr__(self) -> str:
+        start, end = self._span
+
+        return (
+            f"ORF(frame={self.frame}, strand={self.strand}, pos={self.pos}, "
+            f"length={(end - start) // 3})"
+        )
+
+    def _slice(self, span: tuple[int, int]) -> str:
+        """Return a slice of the source that may wrap around its end."""
+        start, end = span
+        length = len(self._source)
+
+        if end <= length:
+            return self._source[start:end]
+
+        return self._source[start:] + self._source[: end - length]
+
+    @property
+    def nuc(self) -> str:
+        """The nucleotide sequence of the ORF."""
+        return self._slice(self._nuc_span)
+
+    @property
+    def pro(self) -> str:
+        """The protein sequence of the ORF, excluding the stop codon."""
+        return translate(self._slice(self._span), self.genetic_code)
+
+    def to_dict(self) -> dict:
+        """Return the ORF as a :class:`dict` as previously returned by
+        :func:`find_orfs`.
+
+        :return: the ORF and its metadata
+
+        """
+        return {
+            "pro": self.pro,
+            "nuc": self.nuc,
+            "frame": self.frame,
+            "strand": self.strand,
+            "pos": self.pos,
+        }
+
+
+def _iter_orf_starts(
+    starts: bytes | None,
+    aa_start: int,
+    limit: int,
+    nested: bool,
+) -> Iterator[int]:
+    """Yield the residues an ORF can begin at between a stop codon and ``limit``.
+
+    :param starts: the start codon markers for the frame or ``None`` to begin
+                   immediately after the stop codon
+    :param aa_start: the first residue after the stop codon
+    :param limit: the residue ORFs must begin before to meet the minimum length
+    :param nested: yield every start codon rather than only the first
+    :return: the residues ORFs begin at
+
+    """
+    if starts is None:
+        if aa_start < limit:
+            yield aa_start
+
+        return
+
+    position = starts.find(1, aa_start, limit)
+
+    while position != -1:
+        yield position
+
+        if not nested:
+            return
+
+        position = starts.find(1, position + 1, limit)
+
+
+def find_orfs(
+    sequence: str,
+    genetic_code: int = 1,
+    min_sequence_length: int = 301,
+    min_protein_length: int = 100,
+    start_codons: Collection[str] | None = None,
+    nested: bool = False,
+    circular: bool = False,
+) -> list[ORF]:
+    """Return all ORFs for the nucelotide sequence.
+    By default, no ORFs will be returned for sequences shorter than 300 bp
+    Only ORFs 100 residues long or greater will be returned.
+
+    By default, ORFs run from one stop codon to the next. When ``start_codons`` is
+    given, ORFs begin at the first in-frame start codon after a stop instead, and
+    every in-frame start codon when ``nested`` is set. Use :data:`ATG_START_CODONS`
+    or :data:`ALTERNATIVE_START_CODONS` for the common cases.
+
+    ORFs shorter than the minimum are discarded during the scan without creating
+    results. When ``circular`` is set, ORFs may wrap around the origin and every ORF
+    must end with a stop codon and be no longer than the sequence.
+
+    The ORFs are returned as :class:`ORF` objects rather than :class:`dict`. They can
+    be read like dictionaries, but must be converted with :meth:`ORF.to_dict` to be
+    serialized as JSON.
+
+    :param sequence:
+    :param genetic_code: the NCBI translation table ID to use
+    :param min_sequence_length: the shortest sequence to look for ORFs in
+    :param min_protein_length: the fewest residues an ORF can have, excluding the stop
+    :param start_codons: the codons ORFs must begin with
+    :param nested: report ORFs for every in-frame start codon before a stop
+    :param circular: treat the sequence as a circular genome
+    :return: a list of ORFs and metadata
+    """
+    orfs: list[ORF] = []
+
+    sequence_length = len(sequence)
+
+    # Only look for ORFs if the contig is long enough.
+    if sequence_length < max(min_sequence_length, 1):
+        return orfs
+
+    lookup = _codon_lookup(genetic_code)
+
+    start_lookup = None
+
+    if start_codons is not None:
+        start_lookup = _start_lookup(
+            frozenset(codon.upper() for codon in start_codons),
+        )
+
+    # A circular sequence is repeated so every ORF has a complete copy that begins in
+    # the second to last repeat. Finding the first start codon after a stop needs to
+    # look up to three lengths upstream, by which point every frame has been read.
+    repeats = 5 if start_lookup is not None and not nested else 3
+    offset = (repeats - 2) * sequence_length
+
+    # Looks at both forward (+) and reverse (-) strands.
+    for strand, nuc in [(+1, sequence), (-1, reverse_complement(sequence))]:
+        source = nuc * repeats if circular else nuc
+
+        codes = _encode_codons(source)
+        columns = (codes[0::3], codes[1::3], codes[2::3])
+
+        # Look in all three translation frames.
+        for frame in range(3):
+            translation = _translate_frame(columns, frame, lookup).decode()
+            translation_length = len(translation)
+
+            starts = None
+
+            if start_lookup is not None:
+                starts = _translate_frame(columns, frame, start_lookup)
+
+            aa_start = 0
+
+            # Extract ORFs.
+            while aa_start < translation_length:
+                aa_end = translation.find("*", aa_start)
+
+                if aa_end == -1:
+                    aa_end = translation_length
+
+                # Skip stretches too short to hold an ORF without scanning them.
+                # Circular ORFs must end with a stop codon, follow a stop codon unless
+                # every start codon is reported, and overlap the repeat they are
+                # taken from.
+                if aa_end - aa_start < min_protein_length or (
+                    circular
+                    and (
+                        aa_end == translation_length
+                        or (aa_start == 0 and not (nested and starts is not None))
+                        or frame + aa_end * 3 + 3 <= offset
+                        or frame + aa_start * 3 >= offset + sequence_length
+                    )
+                ):
+                    aa_start = aa_end + 1
+                    continue
+
+                for begin in _iter_orf_starts(
+                    starts,
+                    aa_start,
+                    aa_end - min_protein_length + 1,
+                    nested,
+                ):
+                    span = (frame + begin * 3, frame + aa_end * 3)
+
+                    if circular:
+                        # Only keep ORFs that begin in the chosen repeat and move
+                        # them to the first one, so they only refer to ``nuc``.
+                        if not 0 <= span[0] - offset < sequence_length:
+                            continue
+
+                        span = (span[0] - offset, span[1] - offset)
+                        nuc_span = (span[0], span[1] + 3)
+
+                        if nuc_span[1] - nuc_span[0] > sequence_length:
+                            continue
+
+                        if strand == 1:
+                            start = nuc_span[0] % sequence_length
+                            end = (nuc_span[1] - 1) % sequence_length + 1
+                        else:
+                            start = -nuc_span[1] % sequence_length
+                            end = -nuc_span[0] % sequence_length or sequence_length
+                    else:
+                        if strand == 1:
+                            start = frame + begin * 3
+                            end = min(sequence_length, frame + aa_end * 3 + 3)
+                        else:
+                            start = sequence_length - frame - aa_end * 3 - 3
+                            end = sequence_length - frame - begin * 3
+
+                        nuc_span = (start, end)
+
+                    orfs.append(
+                        ORF(
+                            nuc,
+                            span[0] % 3,
+                            strand,
+                            (start, end),
+                            span,
+                            nuc_span,
+                            genetic_code,
+                        ),
+                    )
+
+                aa_start = aa_end + 1
+
+    return orfs
+
+
+def _chunk_sequences(
+    sequences: Iterable[str | bytes],
+    chunk_size: int,
+) -> Iterator[tuple[int, bytes, list[int]]]:
+    """Pack sequences into chunks of roughly ``chunk_size`` nucleotides.
+
+    Each chunk is a single joined buffer and the lengths of the sequences in it, so
+    it is pickled as one :class:`bytes` object rather than many strings.
+
+    :param sequences: the nucleotide sequences
+    :param chunk_size: the number of nucleotides to target per chunk
+    :return: tuples of the index of the first sequence, the buffer, and the lengths
+
+    """
+    first = 0
+    parts = []
+    lengths = []
+    size = 0
+
+    for index, sequence in enumerate(sequences):
+        if isinstance(sequence, str):
+            sequence = sequence.encode()
+
+        parts.append(sequence)
+        lengths.append(len(sequence))
+        size += len(sequence)
+
+        if size >= chunk_size:
+            yield first, b"".join(parts), lengths
+            first = index + 1
+            parts = []
+            lengths = []
+            size = 0
+
+    if parts:
+        yield first, b"".join(parts), lengths
+
+
+def _find_orfs_chunk(
+    first: int,
+    buffer: bytes,
+    lengths: list[int],
+    options: dict,
+) -> list[tuple[int, list[ORF]]]:
+    """Find the ORFs in every sequence of a chunk packed by :func:`_chunk_sequences`.
+
+    :param first: the index of the first sequence in the chunk
+    :param buffer: the joined sequences
+    :param lengths: the length of each sequence in ``buffer``
+    :param options: keyword arguments for :func:`find_orfs`
+    :return: the index and ORFs of each sequence
+
+    """
+    text = buffer.decode()
+    results = []
+    position = 0
+
+    for index, length in enumerate(lengths, first):
+        results.append(
+            (index, find_orfs(text[position : position + length], **options)),
+        )
+        position += length
+
+    return results
+
+
+def find_orfs_batch(
+    sequences: Iterable[str | bytes],
+    processes: int = 1,
+    chunk_size: int = ORF_CHUNK_SIZE,
+    **options,
+) -> Iterator[tuple[int, list[ORF]]]:
+    """Find the ORFs in many nucleotide sequences using a pool of processes.
+
+    Sequences are packed into chunks of about ``chunk_size`` nucleotides and sent to
+    the workers as bytes. Results are yielded as soon as each chunk finishes, so they
+    are not in input order. Each result is paired with the index of its sequence in
+    ``sequences``.
+
+    Only ``processes * 2`` chunks are in flight at once, so ``sequences`` can be a
+    lazy iterable such as :func:`iter_fasta`.
+
+    :param sequences: the nucleotide sequences
+    :param processes: the number of worker processes to use
+    :param chunk_size: the number of nucleotides to send to a worker at once
+    :param options: keyword arguments for :func:`find_orfs`, such as
+                    ``genetic_code`` or ``min_protein_length``
+    :return: tuples of the sequence index and the ORFs found by :func:`find_orfs`
+
+    """
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+
+    chunks = _chunk_sequences(sequences, chunk_size)
+
+    if processes == 1:
+        for chunk in chunks:
+            yield from _find_orfs_chunk(*chunk, options)
+
+        return
+
+    with ProcessPoolExecutor(processes) as executor:
+        pending: set[Future] = set()
+
+        try:
+            for chunk in chunks:
+                pending.add(executor.submit(_find_orfs_chunk, *chunk, options))
+
+                if len(pending) >= processes * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        yield from future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+#: The number of mean read quality bins reported in :attr:`Quality.sequences`.
+QUALITY_SEQUENCE_BINS = 50
+
+#: The nucleotides reported in :attr:`Quality.composition`, in order.
+QUALITY_COMPOSITION_BASES = "GATC"
+
+
+def _percentile(counts: array, offset: int, total: int, percentile: int) -> int:
+    """Return a percentile of the quality histogram in ``counts`` starting at
+    ``offset``.
+
+    :param counts: the flat quality histograms
+    :param offset: the index of the first ASCII quality character in the histogram
+    :param total: the number of qualities in the histogram
+    :param percentile: the percentile to return
+    :return: the ASCII quality character at the percentile
+
+    """
+    target = total * percentile / 100
+    cumulative = 0
+
+    for value in range(128):
+        cumulative += counts[offset + value]
+
+        if cumulative >= target:
+            return value
+
+    return 127
+
+
+class QualityAccumulator:
+    """Accumulate the quality statistics for FASTQ reads in a single streaming pass.
+
+    Records are added in batches as yielded by :func:`iter_fastq_batches` or
+    :func:`read_fastq_batches_from_path`. All statistics are kept as flat integer
+    histograms, so memory use depends only on the longest read and accumulators for
+    different files, or different parts of a file, can be combined with
+    :meth:`merge`.
+
+    Call :meth:`to_quality` to build a :class:`~virtool_core.models.samples.Quality`.
+
+    """
+
+    def __init__(self):
+        #: The number of reads added.
+        self.count = 0
+
+        #: The number of reads of each length.
+        self.lengths: Counter[int] = Counter()
+
+        #: The number of each ASCII quality character, 128 counts per read position.
+        self._qualities = array("Q")
+
+        #: The number of each of G, A, T, and C, 4 counts per read position.
+        self._bases = array("Q")
+
+        #: The number of reads by their mean ASCII quality character.
+        self._sequences = array("Q", bytes(8 * 128))
+
+    @property
+    def positions(self) -> int:
+        """The length of the longest read added."""
+        return len(self._bases) // 4
+
+    def _grow(self, positions: int):
+        if positions > self.positions:
+            extra = positions - self.positions
+            self._qualities.extend(repeat(0, extra * 128))
+            self._bases.extend(repeat(0, extra * 4))
+
+    def add(self, records: Iterable[tuple[str | None, str, str]]):
+        """Add FASTQ records to the accumulator.
+
+        The reads are joined so every read position can be sliced out of the batch
+        and counted as a single column. Shorter reads are padded with characters that
+        are not counted.
+
+        :param records: tuples containing the header, sequence, and quality
+
+        """
+        sequences = []
+        qualities = []
+
+        for _, sequence, quality in records:
+            sequences.append(sequence)
+            qualities.append(quality)
+
+        lengths = list(map(len, sequences))
+
+        if lengths != list(map(len, qualities)):
+            raise ValueError("Sequence and quality lengths differ")
+
+        self.count += len(lengths)
+        self.lengths.update(lengths)
+
+        width = max(lengths, default=0)
+
+        if width == 0:
+            return
+
+        if min(lengths) != width:
+            sequences = [sequence.ljust(width) for sequence in sequences]
+            qualities = [quality.ljust(width, "\0") for quality in qualities]
+
+        self._grow(width)
+
+        sequence = "".join(sequences).upper()
+
+        try:
+            quality = "".join(qualities).encode("ascii")
+        except UnicodeEncodeError:
+            raise ValueError("Quality contains invalid characters") from None
+
+        for position in range(width):
+            offset = position * 128
+
+            for value, count in Counter(quality[position::width]).items():
+                if value:
+                    self._qualities[offset + value] += count
+
+            column = sequence[position::width]
+
+            for index, base in enumerate(QUALITY_COMPOSITION_BASES, position * 4):
+                self._bases[index] += column.count(base)
+
+        for start, length in zip(range(0, len(quality), width), lengths):
+            if length:
+                self._sequences[sum(quality[start : start + length]) // length] += 1
+
+    def merge(self, other: "QualityAccumulator") -> "QualityAccumulator":
+        """Add the statistics from ``other`` to this accumulator.
+
+        :param other: another accumulator
+        :return: this accumulator
+
+        """
+        self._grow(other.positions)
+
+        self.count += other.count
+        self.lengths.update(other.lengths)
+
+        for counts, other_counts in (
+            (self._qualities, other._qualities),
+            (self._bases, other._bases),
+            (self._sequences, other._sequences),
+        ):
+            for index, count in enumerate(other_counts):
+                if count:
+                    counts[index] += count
+
+        return self
+
+    @property
+    def encoding(self) -> tuple[str, int]:
+        """The quality encoding of the reads and its ASCII offset.
+
+        The encoding is guessed from the lowest quality character in the same way as
+        FastQC.
+        """
+        lowest = min(
+            (value for value in range(128) if any(self._qualities[value::128])),
+            default=33,
+        )
+
+        if lowest < 33:
+            raise ValueError(f"No known encoding with quality character {lowest}")
+
+        if lowest < 64:
+            return "Sanger / Illumina 1.9", 33
+
+        if lowest == 64:
+            return "Illumina 1.3", 64
+
+        return "Illumina 1.5", 64
+
+    def to_quality(self) -> Quality:
+        """Build a :class:`~virtool_core.models.samples.Quality` from the accumulated
+        statistics.
+
+        :return: the quality statistics for the reads
+
+        """
+        encoding, phred_offset = self.encoding
+
+        bases = []
+        composition = []
+
+        for position in range(self.positions):
+            offset = position * 128
+            histogram = self._qualities[offset : offset + 128]
+            total = sum(histogram)
+
+            if total:
+                mean = sum(value * count for value, count in enumerate(histogram))
+
+                bases.append(
+                    [
+                        round(mean / total - phred_offset, 2),
+                        *(
+                            _percentile(self._qualities, offset, total, percentile)
+                            - phred_offset
+                            for percentile in (50, 25, 75, 10, 90)
+                        ),
+                    ],
+                )
+            else:
+                bases.append([0, 0, 0, 0, 0, 0])
+
+            counts = self._bases[position * 4 : position * 4 + 4]
+            called = sum(counts)
+
+            composition.append(
+                [round(count / called * 100, 1) if called else 0 for count in counts],
+            )
+
+        g, a, t, c = (sum(self._bases[index::4]) for index in range(4))
+
+        sequences = [0] * QUALITY_SEQUENCE_BINS
+
+        for value, count in enumerate(self._sequences):
+            if count:
+                index = min(max(value - phred_offset, 0), QUALITY_SEQUENCE_BINS - 1)
+                sequences[index] += count
+
+        return Quality(
+            bases=bases,
+            composition=composition,
+            count=self.count,
+            encoding=encoding,
+            gc=round((g + c) / (g + a + t + c) * 100, 1) if g + a + t + c else 0,
+            length=[min(self.lengths, default=0), max(self.lengths, default=0)],
+            sequences=sequences,
+        )
+
+
+def _accumulate_quality(
+    batches: Iterator[list[tuple[str, str, str]]],
+) -> QualityAccumulator:
+    """Return an accumulator containing the records in ``batches``."""
+    accumulator = QualityAccumulator()
+
+    for batch in batches:
+        accumulator.add(batch)
+
+    return accumulator
+
+
+def accumulate_fastq_quality(path: Path, processes: int = 1) -> QualityAccumulator:
+    """Accumulate the quality statistics for the FASTQ file at ``path``.
+
+    Uncompressed files are split between ``processes`` processes using
+    :func:`map_reduce_fastq`.
+
+    This is a blocking function. Use :func:`calculate_quality` in async code.
+
+    :param path: the path to the FASTQ file
+    :param processes: the number of processes available for parsing or decompression
+    :return: the accumulated statistics
+
+    """
+    return map_reduce_fastq(
+        path,
+        _accumulate_quality,
+        QualityAccumulator.merge,
+        processes,
+    )
+
+
+async def calculate_quality(paths: Iterable[Path], processes: int = 1) -> Quality:
+    """Calculate the combined quality statistics for one or more FASTQ files.
+
+    Each file is read in its own thread, so the two files of a paired sample are
+    processed concurrently. The statistics for all files are merged into a single
+    :class:`~virtool_core.models.samples.Quality`.
+
+    :param paths: the paths to the FASTQ files
+    :param processes: the number of processes available for parsing or decompression
+    :return: the quality statistics for all reads in the files
+
+    """
+    accumulators = await asyncio.gather(
+        *(
+            asyncio.to_thread(accumulate_fastq_quality, path, processes)
+            for path in paths
+        ),
+    )
+
+    accumulator = QualityAccumulator()
+
+    for other in accumulators:
+        accumulator.merge(other)
+
+    return accumulator.to_quality()
+
+
+#: The longest k-mer that fits in 64 bits when packed at two bits per nucleotide.
+MAX_KMER_LENGTH = 32
+
+#: The Mersenne prime used as the modulus of the k-mer hash function.
+KMER_HASH_PRIME = (1 << 61) - 1
+
+#: The multiplier and increment of the k-mer hash function. These are fixed so sketches
+#: made in different processes and at different times can be compared.
+KMER_HASH_MULTIPLIER = 0x5851F42D4C957F2D % KMER_HASH_PRIME
+KMER_HASH_INCREMENT = 0x14057B7EF767814F % KMER_HASH_PRIME
+
+#: The number of characters of a sequence encoded at a time when scanning k-mers.
+KMER_WINDOW_SIZE = 1024 * 1024
+
+#: Matches runs of unambiguous nucleotides. K-mers never span other characters.
+_KMER_RUN_PATTERN = re.compile("[ACGTacgt]+")
+
+#: Translates nucleotides to their two-bit codes written as base-4 digits.
+_KMER_DIGITS = str.maketrans("ACGTacgt", "01230123")
+
+#: Translates encoded nucleotides to their two-bit codes. Other bytes become ``4``.
+_KMER_CODES = bytes(
+    "ACGTacgt".find(chr(value)) % 4 if chr(value) in "ACGTacgt" else 4
+    for value in range(256)
+)
+
+
+def _check_kmer_length(k: int):
+    if not 1 <= k <= MAX_KMER_LENGTH:
+        raise ValueError(f"k must be between 1 and {MAX_KMER_LENGTH}")
+
+
+def _iter_kmers(
+    sequence: str,
+    k: int,
+    canonical: bool,
+) -> Iterator[tuple[int, int]]:
+    """Yield the position and two-bit packed value of each k-mer in ``sequence``.
+
+    The sequence is encoded :data:`KMER_WINDOW_SIZE` characters at a time and the
+    packed values of the k-mer and its reverse complement are updated incrementally
+    as each nucleotide is reached, so memory use doesn't grow with the sequence.
+    K-mers containing ambiguous nucleotides are skipped.
+
+    Because ``A < C < G < T`` in the packed encoding, the canonical k-mer is the
+    lesser of the packed k-mer and its packed reverse complement.
+
+    :param sequence: the nucleotide sequence
+    :param k: the k-mer length
+    :param canonical: replace each k-mer with its canonical form
+    :return: the position and packed value of each k-mer
+
+    """
+    mask = (1 << 2 * k) - 1
+    shift = 2 * k - 2
+
+    forward = 0
+    reverse = 0
+    length = 0
+
+    for offset in range(0, len(sequence), KMER_WINDOW_SIZE):
+        codes = (
+            sequence[offset : offset + KMER_WINDOW_SIZE]
+            .encode("ascii", "replace")
+            .translate(_KMER_CODES)
+        )
+
+        for position, code in enumerate(codes, offset - k + 1):
+            if code == 4:
+                length = 0
+                continue
+
+            forward = ((forward << 2) | code) & mask
+            reverse = (reverse >> 2) | ((3 - code) << shift)
+            length += 1
+
+            if length >= k:
+                if canonical and reverse < forward:
+                    yield position, reverse
+                else:
+                    yield position, forward
+
+
+def _hash_kmer(packed: int) -> int:
+    """Hash a packed k-mer with a fixed universal hash function."""
+    return (KMER_HASH_MULTIPLIER * packed + KMER_HASH_INCREMENT) % KMER_HASH_PRIME
+
+
+def pack_kmer(kmer: str) -> int:
+    """Return the two-bit packed encoding of a k-mer.
+
+    :param kmer: a k-mer containing only A, C, G, and T
+    :return: the packed k-mer
+
+    """
+    if not _KMER_RUN_PATTERN.fullmatch(kmer):
+        raise ValueError("K-mer contains invalid characters")
+
+    return int(kmer.translate(_KMER_DIGITS), 4)
+
+
+def unpack_kmer(packed: int, k: int) -> str:
+    """Return the k-mer of length ``k`` encoded in ``packed``.
+
+    :param packed: a two-bit packed k-mer
+    :param k: the k-mer length
+    :return: the k-mer
+
+    """
+    return "".join("ACGT"[(packed >> shift) & 3] for shift in range(2 * k - 2, -1, -2))
+
+
+def count_kmers(
+    sequences: Iterable[str],
+    k: int,
+    canonical: bool = True,
+) -> Counter[int]:
+    """Count the k-mers in a stream of sequences.
+
+    K-mers are packed incrementally as each sequence is scanned. K-mers containing
+    ambiguous nucleotides are skipped.
+
+    :param sequences: the nucleotide sequences, such as those from :func:`iter_fasta`
+    :param k: the k-mer length, at most :data:`MAX_KMER_LENGTH`
+    :param canonical: count each k-mer together with its reverse complement
+    :return: counts keyed by two-bit packed k-mer
+
+    """
+    _check_kmer_length(k)
+
+    counts: Counter[int] = Counter()
+
+    for sequence in sequences:
+        counts.update(packed for _, packed in _iter_kmers(sequence, k, canonical))
+
+    return counts
+
+
+def find_minimizers(
+    sequence: str,
+    k: int,
+    w: int,
+    canonical: bool = True,
+) -> list[tuple[int, int]]:
+    """Return the minimizers of ``sequence``.
+
+    The minimizer of a window of ``w`` consecutive k-mers is the one with the lowest
+    hash. Consecutive windows usually share a minimizer, and each is reported once.
+
+    :param sequence: the nucleotide sequence
+    :param k: the k-mer length, at most :data:`MAX_KMER_LENGTH`
+    :param w: the number of k-mers in each window
+    :param canonical: hash canonical k-mers so both strands give the same minimizers
+    :return: the position and hash of each minimizer
+
+    """
+    _check_kmer_length(k)
+
+    if w < 1:
+        raise ValueError("w must be at least 1")
+
+    minimizers = []
+
+    def add(value: int, position: int):
+        if not minimizers or minimizers[-1] != (position, value):
+            minimizers.append((position, value))
+
+    # Hashes and positions in the current window, increasing in hash.
+    window: deque[tuple[int, int]] = deque()
+
+    # No k-mer follows position -2, so the first k-mer starts a new run.
+    run_start = previous = -2
+
+    for position, packed in _iter_kmers(sequence, k, canonical):
+        if position != previous + 1:
+            # A run shorter than a window has a single minimizer.
+            if window and previous - run_start < w - 1:
+                add(*window[0])
+
+            window.clear()
+            run_start = position
+
+        previous = position
+        value = _hash_kmer(packed)
+
+        while window and window[-1][0] >= value:
+            window.pop()
+
+        window.append((value, position))
+
+        if window[0][1] <= position - w:
+            window.popleft()
+
+        if position - run_start >= w - 1:
+            add(*window[0])
+
+    if window and previous - run_start < w - 1:
+        add(*window[0])
+
+    return minimizers
+
+
+class KmerSketch:
+    """A bottom-k MinHash sketch of the k-mers in one or more sequences.
+
+    The sketch keeps the ``size`` lowest k-mer hashes. Sketches with the same ``k``
+    can be compared with :meth:`jaccard` and :meth:`containment` in time proportional
+    to ``size``, however long the sketched sequences were.
+
+    """
+
+    def __init__(self, k: int = 21, size: int = 1000, hashes: Iterable[int] = ()):
+        _check_kmer_length(k)
+
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        #: The k-mer length.
+        self.k = k
+
+        #: The greatest number of hashes kept.
+        self.size = size
+
+        #: The lowest hashes, in increasing order.
+        self.hashes = array("Q", sorted(set(hashes))[:size])
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, KmerSketch):
+            return NotImplemented
+
+        return (self.k, self.size, self.hashes) == (other.k, other.size, other.hashes)
+
+    @classmethod
+    def from_sequences(
+        cls,
+        sequences: Iterable[str],
+        k: int = 21,
+        size: int = 1000,
+    ) -> "KmerSketch":
+        """Sketch a stream of sequences.
+
+        :param sequences: the nucleotide sequences, such as those from
+                          :func:`iter_fasta`
+        :param k: the k-mer length, at most :data:`MAX_KMER_LENGTH`
+        :param size: the number of hashes to keep
+        :return: a new sketch
+
+        """
+        sketch = cls(k, size)
+        sketch.update(sequences)
+        return sketch
+
+    def update(self, sequences: Iterable[str]):
+        """Add the canonical k-mers of a stream of sequences to the sketch.
+
+        The lowest hashes are kept in a bounded max-heap, so memory use is
+        proportional to ``size`` however long the sequences are. Once the heap is
+        full, most hashes are rejected by a single comparison with its greatest
+        value.
+
+        :param sequences: the nucleotide sequences
+
+        """
+        size = self.size
+        multiplier = KMER_HASH_MULTIPLIER
+        increment = KMER_HASH_INCREMENT
+        prime = KMER_HASH_PRIME
+
+        # The kept hashes, negated so the heap root is the greatest.
+        heap = [-value for value in self.hashes]
+        heapq.heapify(heap)
+        kept = set(self.hashes)
+
+        for sequence in sequences:
+            for _, packed in _iter_kmers(sequence, self.k, True):
+                value = (multiplier * packed + increment) % prime
+
+                if len(heap) < size:
+                    if value not in kept:
+                        heapq.heappush(heap, -value)
+                        kept.add(value)
+
+                elif value < -heap[0] and value not in kept:
+                    kept.discard(-heapq.heapreplace(heap, -value))
+                    kept.add(value)
+
+        self.hashes = array("Q", sorted(kept))
+
+    def merge(self, other: "KmerSketch") -> "KmerSketch":
+        """Add the hashes of ``other`` to this sketch.
+
+        :param other: a sketch with the same ``k``
+        :return: this sketch
+
+        """
+        self._check_compatible(other)
+        self.hashes = array("Q", sorted({*self.hashes, *other.hashes})[: self.size])
+        return self
+
+    def _check_compatible(self, other: "KmerSketch"):
+        if self.k != other.k:
+            raise ValueError("Sketches have different k-mer lengths")
+
+    def jaccard(self, other: "KmerSketch") -> float:
+        """Estimate the Jaccard similarity of the k-mers in two sketches.
+
+        :param other: a sketch with the same ``k``
+        :return: the estimated fraction of all k-mers that are shared
+
+        """
+        self._check_compatible(other)
+
+        size = min(self.size, other.size)
+        union = sorted({*self.hashes, *other.hashes})[:size]
+
+        if not union:
+            return 0.0
+
+        shared = set(self.hashes).intersection(other.hashes)
+
+        return sum(value in shared for value in union) / len(union)
+
+    def containment(self, other: "KmerSketch") -> float:
+        """Estimate the fraction of the k-mers in this sketch that are in ``other``.
+
+        Use this to screen a sample against a subtraction or reference, where the
+        sample contains only a small part of the other genome.
+
+        :param other: a sketch with the same ``k``
+        :return: the estimated fraction of k-mers shared with ``other``
+
+        """
+        self._check_compatible(other)
+
+        if not self.hashes or not other.hashes:
+            return 0.0
+
+        # Only hashes below the greatest hash in both sketches were seen by both.
+        threshold = min(self.hashes[-1], other.hashes[-1])
+        own = {value for value in self.hashes if value <= threshold}
+
+        if not own:
+            return 0.0
+
+        return len(own.intersection(other.hashes)) / len(own)
+
+
+def _make_composition_bits() -> bytes:
+    """Return a :meth:`bytes.translate` table that maps A, C, G, and T in either case
+    to bytes with bits 0, 1, 2, and 3 set and every other byte to ``0``.
+    """
+    table = bytearray(256)
+
+    for bit, nucleotide in enumerate("ACGT"):
+        table[ord(nucleotide)] = table[ord(nucleotide.lower())] = 1 << bit
+
+    return bytes(table)
+
+
+_COMPOSITION_BITS = _make_composition_bits()
+
+
+@cache
+def _composition_masks(length: int) -> tuple[int, ...]:
+    """Return integers of ``length`` bytes with one bit set in every byte, for each of
+    bits 0 to 3.
+    """
+    return tuple(
+        int.from_bytes(bytes([1 << bit]) * length, "little") for bit in range(4)
+    )
+
+
+def _strip_fasta_headers(data: bytes) -> bytes:
+    """Remove the header lines from complete FASTA lines."""
+    if not data.startswith(b">") and b"\n>" not in data:
+        return data
+
+    pieces = []
+    position = 0
+
+    while position < len(data):
+        # Headers can follow each other directly when a record has no sequence.
+        header = position if data.startswith(b">", position) else None
+
+        if header is None:
+            header = data.find(b"\n>", position)
+
+            if header == -1:
+                pieces.append(data[position:])
+                break
+
+            header += 1
+            pieces.append(data[position:header])
+
+        end = data.find(b"\n", header)
+        position = len(data) if end == -1 else end + 1
+
+    return b"".join(pieces)
+
+
+def _count_composition(data: bytes) -> list[int]:
+    """Count the nucleotides in complete FASTA lines.
+
+    :param data: complete lines of a FASTA file
+    :return: the counts of A, C, G, T, and all other sequence characters
+
+    """
+    return _count_nucleotides(_strip_fasta_headers(data))
+
+
+def _count_nucleotides(data: bytes) -> list[int]:
+    """Count the nucleotides in FASTA sequence data containing no headers.
+
+    The data is translated so each of A, C, G, and T sets a different bit and read
+    as one big integer. Each nucleotide is counted by masking its bit in every byte
+    and counting the set bits, which avoids scanning the data once per nucleotide.
+
+    :param data: FASTA sequence lines, which may be partial
+    :return: the counts of A, C, G, T, and all other sequence characters
+
+    """
+    if not data:
+        return [0, 0, 0, 0, 0]
+
+    value = int.from_bytes(data.translate(_COMPOSITION_BITS), "little")
+
+    # Masks are made for lengths rounded up to a power of two so only a few are made.
+    masks = _composition_masks(1 << (len(data) - 1).bit_length())
+
+    counts = [(value & mask).bit_count() for mask in masks]
+
+    characters = len(data) - data.count(b"\n") - data.count(b"\r")
+    counts.append(characters - sum(counts))
+
+    return counts
+
+
+def _count_composition_chunks(chunks: Iterable[bytes]) -> list[int]:
+    """Count the nucleotides in binary FASTA chunks.
+
+    Each chunk is counted as soon as it is read. Only whether the chunk boundary fell
+    inside a header or a sequence line is carried to the next chunk, so memory use is
+    bounded by the chunk size even for FASTA files with very long single-line
+    sequences.
+    """
+    totals = [0, 0, 0, 0, 0]
+
+    # Whether the previous chunk ended partway through a header line.
+    in_header = False
+
+    # Whether the next chunk starts at the beginning of a line.
+    line_start = True
+
+    for chunk in chunks:
+        if in_header:
+            end = chunk.find(b"\n")
+
+            if end == -1:
+                continue
+
+            chunk = chunk[end + 1 :]
+            in_header = False
+            line_start = True
+
+        if not line_start:
+            # Count the rest of a sequence line split between chunks.
+            end = chunk.find(b"\n")
+            head = chunk if end == -1 else chunk[: end + 1]
+
+            totals = list(map(operator.add, totals, _count_nucleotides(head)))
+            chunk = chunk[len(head) :]
+
+            if end == -1:
+                continue
+
+        last = chunk.rfind(b"\n") + 1
+
+        if chunk.startswith(b">", last):
+            # Drop the start of a header that continues into the next chunk.
+            chunk = chunk[:last]
+            in_header = True
+
+        line_start = chunk.endswith(b"\n") or not chunk
+
+        totals = list(map(operator.add, totals, _count_composition(chunk)))
+
+    return totals
+
+
+def _find_line_start(f: IO[bytes], offset: int) -> int:
+    """Return the offset of the first line that starts at or after ``offset`` in the
+    binary file ``f``.
+    """
+    if offset == 0:
+        return 0
+
+    f.seek(offset - 1)
+    position = offset - 1
+
+    while data := f.read(FASTQ_CHUNK_SIZE):
+        newline = data.find(b"\n")
+
+        if newline != -1:
+            return position + newline + 1
+
+        position += len(data)
+
+    return position
+
+
+def _count_composition_range(path: Path, start: int, end: int) -> list[int]:
+    """Count the nucleotides between ``start`` and ``end`` in the uncompressed FASTA
+    file at ``path``.
+    """
+    with open(path, "rb") as f:
+        return _count_composition_chunks(_read_range(f, start, end, FASTA_CHUNK_SIZE))
+
+
+def calculate_nucleotide_composition(
+    path: Path,
+    processes: int = 1,
+    min_shard_size: int = FASTA_MIN_SHARD_SIZE,
+) -> NucleotideComposition:
+    """Calculate the nucleotide composition of the FASTA file at `path`.
+
+    The file is read in binary chunks and header lines are skipped. Characters other
+    than A, C, G, and T, in either case, are counted as ``n``. Each value in the
+    returned composition is a fraction of all sequence characters.
+
+    Uncompressed files larger than ``min_shard_size`` are split into up to
+    ``processes`` line-aligned byte ranges that are counted in parallel. Compressed
+    files are read as one stream and ``processes`` is used for decompression.
+
+    This is a blocking function.
+
+    :param path: the path to the FASTA file
+    :param processes: the number of processes to use
+    :param min_shard_size: the smallest byte range to count in its own process
+    :return: the nucleotide composition
+
+    """
+    path = Path(path)
+    shards = 1
+
+    if detect_compression(path) is None:
+        shards = min(processes, -(-path.stat().st_size // max(min_shard_size, 1)))
+
+    if shards <= 1:
+        with open_decompressed(path, processes) as f:
+            counts = _count_composition_chunks(_read_chunks(f, FASTA_CHUNK_SIZE))
+    else:
+        size = path.stat().st_size
+
+        with open(path, "rb") as f:
+            offsets = [
+                _find_line_start(f, size * shard // shards) for shard in range(shards)
+            ]
+
+        with ProcessPoolExecutor(shards) as executor:
+            counts = reduce(
+                lambda left, right: list(map(operator.add, left, right)),
+                executor.map(
+                    _count_composition_range,
+                    repeat(path),
+                    offsets,
+                    [*offsets[1:], size],
+                ),
+            )
+
+    total = sum(counts)
+
+    return NucleotideComposition(
+        **{
+            key: count / total if total else 0.0
+            for key, count in zip("acgtn", counts)
+        },
+    )
+
+
+#: Translates nucleotides to base-4 digits. Other characters become ``0`` and are
+#: restored from the exception list.
+_PACKED_DIGITS = {code: ord("0") for code in range(128)} | str.maketrans(
+    "ACGT", "0123"
+)
+
+#: Translates nucleotides to ``.`` and other characters to ``X`` so exception runs
+#: can be found with :meth:`str.find`, which is much faster than a regex scan.
+_PACKED_EXCEPTION_MASK = {code: ord("X") for code in range(128)} | str.maketrans(
+    "ACGT", "...."
+)
+
+
+#: Complements IUPAC nucleotide codes. Other characters, such as alignment gaps, are
+#: kept unchanged because packed sequences can store them.
+_PACKED_COMPLEMENT = str.maketrans(
+    "".join(COMPLEMENT_TABLE),
+    "".join(COMPLEMENT_TABLE.values()),
+)
+
+
+def _make_unpack_tables() -> tuple[bytes, bytes, bytes, bytes]:
+    """Return :meth:`bytes.translate` tables that map a packed byte to the nucleotide
+    in each of its four two-bit slots.
+    """
+    return tuple(
+        bytes(b"ACGT"[(value >> shift) & 3] for value in range(256))
+        for shift in (6, 4, 2, 0)
+    )
+
+
+_UNPACK_TABLES = _make_unpack_tables()
+
+
+def _find_packed_exceptions(sequence: str) -> Iterator[tuple[int, str]]:
+    """Yield the start and characters of each run in ``sequence`` that isn't A, C, G,
+    or T.
+
+    :param sequence: an upper case ASCII sequence
+    :return: the exception runs in order
+
+    """
+    mask = sequence.translate(_PACKED_EXCEPTION_MASK)
+    start = mask.find("X")
+
+    while start != -1:
+        end = mask.find(".", start)
+
+        if end == -1:
+            end = len(mask)
+
+        yield start, sequence[start:end]
+
+        start = mask.find("X", end)
+
+
+class PackedSequence:
+    """A nucleotide sequence stored at two bits per nucleotide.
+
+    A, C, G, and T are packed four to a byte. Runs of any other characters, such as
+    ``N`` or IUPAC ambiguity codes, are kept in a sorted exception list and restored
+    when the sequence is converted back to :class:`str`. Sequences are stored in upper
+    case.
+
+    Packed sequences support :func:`len`, indexing, slicing, and
+    :meth:`reverse_complement`, and compare equal to the equivalent :class:`str`.
+
+    They can be used as pydantic field types. Fields accept :class:`str` or
+    :class:`PackedSequence` values and serialize to :class:`str`.
+
+    """
+
+    __slots__ = ("_data", "_exceptions", "_length")
+
+    def __init__(self, sequence: str = ""):
+        if not sequence.isascii():
+            raise ValueError("Sequence contains non-ASCII characters")
+
+        sequence = sequence.upper()
+
+        digits = sequence.translate(_PACKED_DIGITS)
+        digits += "0" * (-len(digits) % 4)
+
+        #: The packed nucleotides, four to a byte, padded with zero bits.
+        self._data = int(digits or "0", 4).to_bytes(len(digits) // 4, "big")
+
+        #: The start and characters of each run that isn't A, C, G, or T.
+        self._exceptions = tuple(_find_packed_exceptions(sequence))
+
+        self._length = len(sequence)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self._decode(0, self._length)
+
+    def __repr__(self) -> str:
+        if self._length > 20:
+            return f"PackedSequence('{self._decode(0, 17)}...', length={self._length})"
+
+        return f"PackedSequence('{self}')"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedSequence):
+            return (self._length, self._data, self._exceptions) == (
+                other._length,
+                other._data,
+                other._exceptions,
+            )
+
+        if isinstance(other, str):
+            return len(other) == self._length and str(self) == other
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __getitem__(self, key: int | slice) -> "str | PackedSequence":
+        if isinstance(key, int):
+            if key < 0:
+                key += self._length
+
+            if not 0 <= key < self._length:
+                raise IndexError("PackedSequence index out of range")
+
+            return self._decode(key, key + 1)
+
+        start, stop, step = key.indices(self._length)
+
+        if step != 1:
+            return PackedSequence(str(self)[key])
+
+        return PackedSequence(self._decode(start, max(start, stop)))
+
+    def __getstate__(self):
+        return self._data, self._exceptions, self._length
+
+    def __setstate__(self, state):
+        self._data, self._exceptions, self._length = state
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used to store the packed nucleotides."""
+        return len(self._data)
+
+    def _decode(self, start: int, stop: int) -> str:
+        """Return the nucleotides from ``start`` to ``stop`` as a string.
+
+        The packed bytes covering the range are expanded with one
+        :meth:`bytes.translate` per two-bit slot, interleaved with slice assignment,
+        and then the exceptions in the range are written over them.
+        """
+        first = start // 4
+        data = self._data[first : (stop + 3) // 4]
+
+        expanded = bytearray(len(data) * 4)
+
+        for slot, table in enumerate(_UNPACK_TABLES):
+            expanded[slot::4] = data.translate(table)
+
+        offset = first * 4
+        index = bisect.bisect_right(self._exceptions, start, key=lambda e: e[0]) - 1
+
+        for position, characters in islice(self._exceptions, max(index, 0), None):
+            if position >= stop:
+                break
+
+            # Clip the run to the decoded range so it overwrites exactly the
+            # positions it covers.
+            run_start = max(position, start)
+            run_end = min(position + len(characters), stop)
+
+            if run_end > run_start:
+                expanded[run_start - offset : run_end - offset] = characters[
+                    run_start - position : run_end - position
+                ].encode()
+
+        return expanded[start - offset : stop - offset].decode()
+
+    def reverse_complement(self) -> "PackedSequence":
+        """Return the reverse complement of the sequence.
+
+        IUPAC nucleotide codes are complemented. Other characters, such as ``-``, are
+        accepted by the constructor and are kept unchanged in their reversed
+        positions.
+
+        :return: a new packed sequence
+
+        """
+        return PackedSequence(str(self).translate(_PACKED_COMPLEMENT)[::-1])
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls,
+        source_type: Any,
+        handler: GetCoreSchemaHandler,
+    ) -> core_schema.CoreSchema:
+        from_str = core_schema.no_info_after_validator_function(
+            cls,
+            core_schema.str_schema(),
+        )
+
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_str],
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(str),
+        )
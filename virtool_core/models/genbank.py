@@ -1,8 +1,7 @@
 from pydantic import field_validator
 
 from virtool_core.models.basemodel import BaseModel
-
-VALID_SEQUENCE = frozenset("cagntCAGNT")
+from virtool_core.models.validators import NUCLEOTIDES, check_sequence
 
 
 class Genbank(BaseModel):
@@ -14,7 +13,4 @@ class Genbank(BaseModel):
     @field_validator("sequence")
     def check_sequence(cls, sequence: str) -> str:
         """Checks if the given sequence is valid."""
-        if not set(sequence) <= VALID_SEQUENCE:
-            raise ValueError("The format of the sequence is invalid")
-
-        return sequence.upper()
+        return check_sequence(sequence, NUCLEOTIDES).upper()
@@ -7,6 +7,7 @@ from virtool_core.models.enums import Molecule
 from virtool_core.models.history import HistoryNested
 from virtool_core.models.reference import ReferenceNested
 from virtool_core.models.searchresult import SearchResult
+from virtool_core.models.validators import IUPAC_NUCLEOTIDES, sequence_validator
 
 
 class OTUMinimal(BaseModel):
@@ -37,6 +38,8 @@ class OTUSequence(BaseModel):
     sequence: str
     target: str | None = None
 
+    _check_sequence = sequence_validator("sequence", alphabet=IUPAC_NUCLEOTIDES)
+
 
 class Sequence(OTUSequence):
     """A complete sequence resource as returned for sequence API requests."""
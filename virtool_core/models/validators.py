@@ -1,9 +1,63 @@
 import re
+from functools import cache
 from typing import Any
 
 from pydantic import field_validator
 
 
+#: The unambiguous nucleotides and ``N``.
+NUCLEOTIDES = "ACGTN"
+
+#: The IUPAC nucleotide codes, including ambiguity codes and ``U``.
+IUPAC_NUCLEOTIDES = "ACGTURYSWKMBDHVN"
+
+
+@cache
+def _sequence_alphabet(alphabet: str) -> bytes:
+    """Return the bytes to delete when checking a sequence against ``alphabet``.
+
+    Both cases of each character in the alphabet are included.
+    """
+    return (alphabet.upper() + alphabet.lower()).encode()
+
+
+def check_sequence(sequence: str, alphabet: str = NUCLEOTIDES) -> str:
+    """Check that ``sequence`` only contains characters from ``alphabet``.
+
+    The check is case-insensitive. It deletes every alphabet character from the
+    encoded sequence with :meth:`bytes.translate` and checks that nothing is left,
+    which is a single pass in C and avoids building a :class:`set` of the sequence.
+
+    :param sequence: the sequence to check
+    :param alphabet: the allowed characters
+    :return: the unchanged sequence
+    :raises ValueError: if the sequence contains other characters
+
+    """
+    if not sequence.isascii() or sequence.encode().translate(
+        None,
+        _sequence_alphabet(alphabet),
+    ):
+        raise ValueError("The format of the sequence is invalid")
+
+    return sequence
+
+
+def sequence_validator(*fields: str, alphabet: str = NUCLEOTIDES):
+    """Return a validator that checks ``fields`` with :func:`check_sequence`.
+
+    :param fields: the names of the fields to validate
+    :param alphabet: the allowed characters
+
+    """
+
+    @field_validator(*fields)
+    def func(sequence: str) -> str:
+        return check_sequence(sequence, alphabet)
+
+    return func
+
+
 def normalize_hex_color(color: str) -> str:
     """Validate a hex color and convert all alpha characters to uppercase.
 
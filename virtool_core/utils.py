@@ -1,12 +1,17 @@
 import ast
+import asyncio
+import bz2
 import datetime
 import gzip
 import inspect
+import io
 import os
 import shutil
 import subprocess
 import tarfile
+import threading
 import warnings
+import zlib
 from _ast import (
     AnnAssign,
     Assign,
@@ -22,9 +27,14 @@ from _ast import (
     While,
     With,
 )
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 from tarfile import TarFile
 from textwrap import dedent
+from typing import IO
 
 import arrow
 from enum_tools.documentation import (
@@ -36,16 +46,305 @@ from enum_tools.documentation import (
     _docstring_from_sphinx_comment,
 )
 
+#: The magic bytes at the start of files in each supported compression format.
+COMPRESSION_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
 
-def compress_file(path: Path, target: Path, processes: int = 1) -> None:
-    """Compress the file at `path` to a gzipped file at `target`.
+#: The file suffixes used for each supported compression format.
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bzip2",
+    ".zst": "zstd",
+}
+
+#: The default zstd compression level.
+ZSTD_LEVEL = 3
+
+#: The size of the independently compressed blocks written by
+#: :class:`ParallelGzipWriter`.
+GZIP_BLOCK_SIZE = 1024 * 1024
+
+#: Chunks at least this large are compressed or decompressed in a thread by the
+#: async streaming functions. Smaller chunks are handled on the event loop.
+STREAM_THREAD_SIZE = 64 * 1024
+
+#: How often, in seconds, progress is reported while a command processes a file.
+COMMAND_PROGRESS_INTERVAL = 0.1
+
+
+class ParallelGzipWriter(io.BufferedIOBase):
+    """A writable binary stream that gzip-compresses blocks in a thread pool.
+
+    Written data is split into ``block_size`` blocks. Each block is compressed into a
+    complete gzip member by :func:`zlib.compress`, which releases the GIL, so blocks
+    are compressed in parallel without an external ``pigz`` binary. The members are
+    written to ``target`` in order. Concatenated gzip members are a valid gzip file.
+
+    At most ``processes * 2`` blocks are held in memory at once. An exception raised
+    while compressing a block is re-raised from the :meth:`write` or :meth:`close`
+    call that collects it.
+
+    .. code-block:: python
+
+        with ParallelGzipWriter(Path("reads.fq.gz"), processes=4) as f:
+            f.write(data)
+
+    :param target: the path of the file to write
+    :param processes: the number of threads to compress with
+    :param compresslevel: the gzip compression level
+    :param block_size: the number of uncompressed bytes in each gzip member
+
+    """
+
+    def __init__(
+        self,
+        target: Path,
+        processes: int = 1,
+        compresslevel: int = 6,
+        block_size: int = GZIP_BLOCK_SIZE,
+    ):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+
+        super().__init__()
+
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._compresslevel = compresslevel
+        self._executor = ThreadPoolExecutor(processes)
+        self._file = open(target, "wb")
+        self._max_pending = processes * 2
+        self._pending: deque[Future[bytes]] = deque()
+        self._written = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        self._buffer += data
+
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[: self._block_size]))
+            del self._buffer[: self._block_size]
+
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            if self._buffer or not self._written:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+
+            while self._pending:
+                self._write_next()
+        finally:
+            for future in self._pending:
+                future.cancel()
+
+            self._executor.shutdown()
+            self._file.close()
+            super().close()
+
+    def _submit(self, block: bytes):
+        """Compress ``block`` in the thread pool, first writing the oldest pending
+        member if the pool is full.
+        """
+        if len(self._pending) >= self._max_pending:
+            self._write_next()
+
+        self._pending.append(
+            self._executor.submit(zlib.compress, block, self._compresslevel, 31),
+        )
+        self._written = True
+
+    def _write_next(self):
+        """Wait for the oldest pending block and write its gzip member."""
+        self._file.write(self._pending.popleft().result())
+
+
+class _GzipStreamDecompressor:
+    """Incrementally decompress a gzip stream that may contain multiple members.
+
+    Output is produced in pieces of at most :data:`GZIP_BLOCK_SIZE` bytes so a single
+    small input chunk can't expand into one huge buffer.
+    """
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(31)
+        self._started = False
+
+    def decompress(self, chunk: bytes) -> list[bytes]:
+        """Decompress ``chunk`` and return the decompressed pieces."""
+        pieces = []
+
+        while chunk:
+            if self._decompressor.eof:
+                self._decompressor = zlib.decompressobj(31)
+
+            self._started = True
+
+            if data := self._decompressor.decompress(chunk, GZIP_BLOCK_SIZE):
+                pieces.append(data)
+
+            if self._decompressor.eof:
+                chunk = self._decompressor.unused_data
+            else:
+                chunk = self._decompressor.unconsumed_tail
+
+        return pieces
+
+    def finish(self) -> bytes:
+        """Return any remaining output and check that the stream is complete.
+
+        :raises EOFError: if the stream ends partway through a member
+        """
+        data = self._decompressor.flush()
+
+        if self._started and not self._decompressor.eof:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached",
+            )
+
+        return data
+
+
+def compress_chunks(chunks: Iterable[bytes], compresslevel: int = 6) -> Iterator[bytes]:
+    """Compress a stream of byte chunks to a gzip stream.
+
+    Chunks are compressed as they are consumed, so the output can be written or
+    uploaded without an intermediate file.
+
+    .. code-block:: python
+
+        with open(target, "wb") as f:
+            for chunk in compress_chunks(format_fastq(iter_fastq(path))):
+                f.write(chunk)
+
+    :param chunks: the uncompressed chunks
+    :param compresslevel: the gzip compression level
+    :return: the compressed chunks
+
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+
+    yield compressor.flush()
+
+
+def decompress_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decompress a gzip stream given as byte chunks.
+
+    Streams containing multiple gzip members, like those written by pigz or
+    :class:`ParallelGzipWriter`, are decompressed in full.
+
+    :param chunks: the compressed chunks
+    :return: the decompressed chunks
+    :raises EOFError: if the stream is truncated
+
+    """
+    decompressor = _GzipStreamDecompressor()
+
+    for chunk in chunks:
+        yield from decompressor.decompress(chunk)
+
+    if data := decompressor.finish():
+        yield data
+
+
+async def compress_chunks_async(
+    chunks: AsyncIterable[bytes],
+    compresslevel: int = 6,
+) -> AsyncIterator[bytes]:
+    """Compress an async stream of byte chunks to a gzip stream.
+
+    Chunks of at least :data:`STREAM_THREAD_SIZE` bytes are compressed in a thread
+    so the event loop isn't blocked.
+
+    :param chunks: the uncompressed chunks
+    :param compresslevel: the gzip compression level
+    :return: the compressed chunks
+
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+
+    async for chunk in chunks:
+        if len(chunk) >= STREAM_THREAD_SIZE:
+            data = await asyncio.to_thread(compressor.compress, chunk)
+        else:
+            data = compressor.compress(chunk)
+
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+async def decompress_chunks_async(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[bytes]:
+    """Decompress a gzip stream given as an async stream of byte chunks.
+
+    Chunks of at least :data:`STREAM_THREAD_SIZE` bytes are decompressed in a
+    thread so the event loop isn't blocked.
+
+    :param chunks: the compressed chunks
+    :return: the decompressed chunks
+    :raises EOFError: if the stream is truncated
+
+    """
+    decompressor = _GzipStreamDecompressor()
+
+    async for chunk in chunks:
+        if len(chunk) >= STREAM_THREAD_SIZE:
+            pieces = await asyncio.to_thread(decompressor.decompress, chunk)
+        else:
+            pieces = decompressor.decompress(chunk)
+
+        for data in pieces:
+            yield data
+
+    if data := decompressor.finish():
+        yield data
+
+
+def compress_file(
+    path: Path,
+    target: Path,
+    processes: int = 1,
+    compression: str = "gzip",
+) -> None:
+    """Compress the file at `path` to a gzip- or zstd-compressed file at `target`.
+
+    For gzip, pigz is used when :func:`should_use_pigz` allows it. Otherwise,
+    multiple processes compress in-process with a :class:`ParallelGzipWriter` and a
+    single process uses gzip. For zstd, the ``zstd`` binary is used with one thread
+    per process.
 
     :param path: the path of the file to be compressed
     :param target: path where the compressed file should be saved
     :param processes: the number of processes available for compression
+    :param compression: the compression format, ``gzip`` or ``zstd``
     """
-    if should_use_pigz(processes):
+    if compression == "zstd":
+        compress_file_with_zstd(path, target, threads=processes)
+    elif compression != "gzip":
+        raise ValueError(f"Unsupported compression format: {compression}")
+    elif should_use_pigz(processes):
         compress_file_with_pigz(path, target, processes)
+    elif processes > 1:
+        compress_file_with_threads(path, target, processes)
     else:
         compress_file_with_gzip(path, target)
 
@@ -60,29 +359,106 @@ def compress_file_with_gzip(path: Path, target: Path) -> None:
             shutil.copyfileobj(f_in, f_out)
 
 
+def compress_file_with_threads(path: Path, target: Path, processes: int) -> None:
+    """Compress a file with gzip using a thread pool
+
+    :param path: path to the file to be compressed
+    :param target: path where the compressed file should be stored
+    :param processes: the number of threads to compress with
+    """
+    with open(path, "rb") as f_in:
+        with ParallelGzipWriter(target, processes) as f_out:
+            shutil.copyfileobj(f_in, f_out, GZIP_BLOCK_SIZE)
+
+
 def compress_file_with_pigz(path: Path, target: Path, processes: int):
     """Use pigz to compress a file
     :param path: path to the file to be compressed
     :param target: path where the compressed file should be stored
     :param processes: number of processes allowable for pigz (-p argument)
+    :raises subprocess.CalledProcessError: if pigz exits with a non-zero status
     """
     command = ["pigz", "-p", str(processes), "-k", "--stdout", str(path.resolve())]
 
     with open(target, "wb") as f:
-        subprocess.call(command, stdout=f)
+        subprocess.run(command, stdout=f, check=True)
+
+
+def _zstd_compress_command(level: int, threads: int) -> list[str]:
+    """Return the zstd command for compressing at ``level`` with ``threads``.
+
+    :raises ValueError: if the level or thread count is invalid
+    :raises OSError: if the zstd binary isn't available
+    """
+    if not 1 <= level <= 22:
+        raise ValueError("zstd level must be between 1 and 22")
+
+    if threads < 1:
+        raise ValueError("threads must be at least 1")
+
+    if not shutil.which("zstd"):
+        raise OSError("The zstd binary is required to write zstd-compressed files")
+
+    command = ["zstd", "-q", f"-{level}", f"-T{threads}"]
+
+    if level > 19:
+        command.append("--ultra")
+
+    return command
+
+
+def _zstd_decompress_command() -> list[str]:
+    """Return the zstd command for decompressing.
+
+    :raises OSError: if the zstd binary isn't available
+    """
+    if not shutil.which("zstd"):
+        raise OSError("The zstd binary is required to read zstd-compressed files")
+
+    return ["zstd", "-d", "-q"]
+
+
+def compress_file_with_zstd(
+    path: Path,
+    target: Path,
+    level: int = ZSTD_LEVEL,
+    threads: int = 1,
+) -> None:
+    """Compress a file using the zstd binary
+
+    :param path: path to the file to be compressed
+    :param target: path where the compressed file should be stored
+    :param level: the zstd compression level from 1 to 22
+    :param threads: the number of threads zstd should compress with (-T argument)
+    :raises subprocess.CalledProcessError: if zstd exits with a non-zero status
+    """
+    subprocess.run(
+        [*_zstd_compress_command(level, threads), "-f", "-o", str(target), str(path)],
+        check=True,
+    )
 
 
 def decompress_file(path: Path, target: Path, processes: int = 1) -> None:
-    """Decompress the gzip-compressed file at `path` to a `target` file.
+    """Decompress the gzip-, bzip2-, or zstd-compressed file at `path` to a `target`
+    file.
 
-    pigz will be used when multiple processes are allowed, otherwise gzip is used
+    The format is detected with :func:`detect_compression`. zstd-compressed files
+    are decompressed with the ``zstd`` binary and bzip2-compressed files with
+    :mod:`bz2`. For gzip, pigz will be used when multiple processes are allowed,
+    otherwise gzip is used.
 
     :param path: path to the compressed file to be decompressed
     :param target: path for the newly decompressed file to be stored
     :param processes: number of allowable processes for decompression
 
     """
-    if should_use_pigz(processes):
+    compression = detect_compression(path)
+
+    if compression == "zstd":
+        decompress_file_with_zstd(path, target)
+    elif compression == "bzip2":
+        decompress_file_with_bzip2(path, target)
+    elif should_use_pigz(processes):
         decompress_file_with_pigz(path, target, processes)
     else:
         decompress_file_with_gzip(path, target)
@@ -99,12 +475,24 @@ def decompress_file_with_gzip(path: Path, target: Path):
             shutil.copyfileobj(f_in, f_out)
 
 
+def decompress_file_with_bzip2(path: Path, target: Path):
+    """Decompress a file using bzip2
+
+    :param path: path to the compressed file to be decompressed
+    :param target: path for the newly decompressed file to be stored
+    """
+    with bz2.open(path, "rb") as f_in:
+        with open(target, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+
+
 def decompress_file_with_pigz(path: Path, target: Path, processes: int):
     """Decompress a file using pigz
 
     :param path: path to the compressed file to be decompressed
     :param target: path for the newly decompressed file to be stored
     :param processes: the number of allowable processes for pigz (-p argument)
+    :raises subprocess.CalledProcessError: if pigz exits with a non-zero status
     """
     command = [
         "pigz",
@@ -116,8 +504,21 @@ def decompress_file_with_pigz(path: Path, target: Path, processes: int):
         str(path.resolve()),
     ]
 
-    with open(target, "w") as f:
-        subprocess.call(command, stdout=f)
+    with open(target, "wb") as f:
+        subprocess.run(command, stdout=f, check=True)
+
+
+def decompress_file_with_zstd(path: Path, target: Path):
+    """Decompress a file using the zstd binary
+
+    :param path: path to the compressed file to be decompressed
+    :param target: path for the newly decompressed file to be stored
+    :raises subprocess.CalledProcessError: if zstd exits with a non-zero status
+    """
+    subprocess.run(
+        [*_zstd_decompress_command(), "-f", "-o", str(target), str(path)],
+        check=True,
+    )
 
 
 def is_within_directory(directory: Path, target: Path) -> bool:
@@ -133,20 +534,51 @@ def is_within_directory(directory: Path, target: Path) -> bool:
     return os.path.commonprefix([abs_directory, abs_target]) == abs_directory
 
 
-def safely_extract_tgz(tar: TarFile, path: Path):
+def safely_extract_tgz(
+    tar: TarFile,
+    path: Path,
+    progress: Callable[[int], None] | None = None,
+):
     """Safely extract a tar.gz file, ensuring that all member files are within the
     tarball.
 
     This prevents directory traversal attacks described in CVE-2007-4559.
 
+    The archive is read in a single pass. Each member is checked as it is reached and
+    extracted straight away, so the archive is never decompressed twice and ``tar``
+    can be opened in stream mode (``r|``). If a member fails the check, members
+    before it will already have been extracted.
+
+    As in :meth:`tarfile.TarFile.extractall`, directory attributes are set after all
+    members are extracted so restrictive permissions don't block their contents.
+
     :param tar: the tarfile
     :param path: the path to extract to
+    :param progress: called with the total size of the members extracted so far
+                     after each member is extracted
     """
-    for member in tar.getmembers():
+    directories = []
+    extracted = 0
+
+    for member in tar:
         if not is_within_directory(path, path / member.name):
             raise Exception("Attempted Path Traversal in Tar File")
 
-    tar.extractall(path)
+        if member.isdir():
+            directories.append(member)
+
+        tar.extract(member, path, set_attrs=not member.isdir())
+
+        if progress:
+            extracted += member.size
+            progress(extracted)
+
+    for member in sorted(directories, key=lambda m: m.name, reverse=True):
+        directory_path = os.path.join(path, member.name)
+
+        tar.chown(member, directory_path, False)
+        tar.utime(member, directory_path)
+        tar.chmod(member, directory_path)
 
 
 def should_use_pigz(processes: int) -> bool:
@@ -160,15 +592,300 @@ def should_use_pigz(processes: int) -> bool:
     return bool(processes > 1 and shutil.which("pigz"))
 
 
-def decompress_tgz(path: Path, target: Path):
+def decompress_tgz(path: Path, target: Path, processes: int = 1):
     """Decompress the tar.gz file at ``path`` to the directory ``target``.
 
+    The archive is decompressed with :func:`open_decompressed`, which uses pigz when
+    :func:`should_use_pigz` allows it, and is extracted in a single streaming pass
+    with :func:`safely_extract_tgz`.
+
     :param path: the path to the tar.gz file.
     :param target: the path to directory into which to decompress the tar.gz file.
+    :param processes: the number of processes available for decompression
 
     """
-    with tarfile.open(path, "r:gz") as tar:
-        safely_extract_tgz(tar, target)
+    _decompress_tgz_with_progress(path, target, processes, None)
+
+
+def _copy_with_progress(
+    f_in: IO[bytes],
+    f_out: IO[bytes],
+    progress: Callable[[int], None],
+):
+    """Copy ``f_in`` to ``f_out``, calling ``progress`` with the number of bytes
+    copied so far after each chunk.
+    """
+    copied = 0
+
+    while chunk := f_in.read(GZIP_BLOCK_SIZE):
+        f_out.write(chunk)
+        copied += len(chunk)
+        progress(copied)
+
+
+def _compress_file_with_progress(
+    path: Path,
+    target: Path,
+    processes: int,
+    progress: Callable[[int], None],
+):
+    with open(path, "rb") as f_in:
+        if processes > 1:
+            f_out = ParallelGzipWriter(target, processes)
+        else:
+            f_out = gzip.open(target, "wb", compresslevel=6)
+
+        with f_out:
+            _copy_with_progress(f_in, f_out, progress)
+
+
+def _decompress_file_with_progress(
+    path: Path,
+    target: Path,
+    compression: str | None,
+    progress: Callable[[int], None],
+):
+    opener = bz2.open if compression == "bzip2" else gzip.open
+
+    with opener(path, "rb") as f_in, open(target, "wb") as f_out:
+        _copy_with_progress(f_in, f_out, progress)
+
+
+def _decompress_tgz_with_progress(
+    path: Path,
+    target: Path,
+    processes: int,
+    progress: Callable[[int], None] | None,
+):
+    with open_decompressed(path, processes) as f:
+        with tarfile.open(fileobj=f, mode="r|") as tar:
+            safely_extract_tgz(tar, target, progress)
+
+
+async def _run_in_thread(
+    func: Callable[..., None],
+    *args,
+    progress: Callable[[int], None] | None = None,
+):
+    """Run ``func`` in a thread, passing it a callback that forwards progress to the
+    event loop.
+
+    ``func`` is called with ``args`` followed by the callback. The callback calls
+    ``progress`` on the event loop thread. When the calling task is cancelled, the
+    next call to the callback raises :class:`asyncio.CancelledError` in the thread and
+    the cancellation completes once the thread has stopped.
+
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+
+    def report(count: int):
+        if cancelled.is_set():
+            raise asyncio.CancelledError
+
+        if progress:
+            loop.call_soon_threadsafe(progress, count)
+
+    task = asyncio.ensure_future(asyncio.to_thread(func, *args, report))
+
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        cancelled.set()
+        await asyncio.wait([task])
+        raise
+
+
+async def _run_command_to_file(
+    command: list[str],
+    target: Path,
+    stdin: Path | None = None,
+    progress: Callable[[int], None] | None = None,
+):
+    """Run ``command`` with :func:`asyncio.create_subprocess_exec` and write its
+    standard output to ``target``.
+
+    The process reads and writes the files directly, so no data passes through the
+    event loop. If ``stdin`` is given, the file is used as the standard input of the
+    process and ``progress`` is called with the number of bytes it has read so far.
+    Otherwise, ``progress`` is called with the number of bytes written to ``target``
+    so far. Progress is read from the file offset shared with the process every
+    :data:`COMMAND_PROGRESS_INTERVAL` seconds and once more when the process exits.
+
+    The process is killed if the task is cancelled or fails.
+
+    :raises subprocess.CalledProcessError: if the command exits with a non-zero status
+
+    """
+    with ExitStack() as stack:
+        f_out = stack.enter_context(await asyncio.to_thread(open, target, "wb"))
+        f_in = None
+
+        if stdin:
+            f_in = stack.enter_context(await asyncio.to_thread(open, stdin, "rb"))
+
+        tracked = (f_in or f_out).fileno()
+
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=f_in or subprocess.DEVNULL,
+            stdout=f_out,
+        )
+
+        try:
+            wait = asyncio.ensure_future(process.wait())
+
+            while True:
+                done, _ = await asyncio.wait([wait], timeout=COMMAND_PROGRESS_INTERVAL)
+
+                if progress:
+                    progress(os.lseek(tracked, 0, os.SEEK_CUR))
+
+                if done:
+                    break
+
+            # Give a cancellation requested by the last progress call a chance to be
+            # delivered before returning.
+            await asyncio.sleep(0)
+
+            returncode = wait.result()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+async def compress_file_async(
+    path: Path,
+    target: Path,
+    processes: int = 1,
+    progress: Callable[[int], None] | None = None,
+    compression: str = "gzip",
+) -> None:
+    """Compress the file at `path` to a gzip- or zstd-compressed file at `target`
+    without blocking the event loop.
+
+    zstd, and pigz when :func:`should_use_pigz` allows it, are run with
+    :func:`asyncio.create_subprocess_exec`. Otherwise, the file is gzipped in a
+    thread as in :func:`compress_file`.
+
+    If the task is cancelled, compression stops and `target` is removed.
+
+    :param path: the path of the file to be compressed
+    :param target: path where the compressed file should be saved
+    :param processes: the number of processes available for compression
+    :param progress: called with the number of bytes of `path` compressed so far
+    :param compression: the compression format, ``gzip`` or ``zstd``
+    """
+    if compression not in ("gzip", "zstd"):
+        raise ValueError(f"Unsupported compression format: {compression}")
+
+    try:
+        if compression == "zstd":
+            await _run_command_to_file(
+                [*_zstd_compress_command(ZSTD_LEVEL, processes), "-c"],
+                target,
+                stdin=path,
+                progress=progress,
+            )
+        elif should_use_pigz(processes):
+            await _run_command_to_file(
+                ["pigz", "-p", str(processes), "--stdout"],
+                target,
+                stdin=path,
+                progress=progress,
+            )
+        else:
+            await _run_in_thread(
+                _compress_file_with_progress,
+                path,
+                target,
+                processes,
+                progress=progress,
+            )
+    except asyncio.CancelledError:
+        target.unlink(missing_ok=True)
+        raise
+
+
+async def decompress_file_async(
+    path: Path,
+    target: Path,
+    processes: int = 1,
+    progress: Callable[[int], None] | None = None,
+) -> None:
+    """Decompress the gzip-, bzip2-, or zstd-compressed file at `path` to a `target`
+    file without blocking the event loop.
+
+    The format is detected with :func:`detect_compression`. zstd, and pigz when
+    :func:`should_use_pigz` allows it, are run with
+    :func:`asyncio.create_subprocess_exec`. Otherwise, the file is decompressed with
+    :mod:`bz2` or gzip in a thread.
+
+    If the task is cancelled, decompression stops and `target` is removed.
+
+    :param path: path to the compressed file to be decompressed
+    :param target: path for the newly decompressed file to be stored
+    :param processes: number of allowable processes for decompression
+    :param progress: called with the number of decompressed bytes written so far
+    """
+    compression = await asyncio.to_thread(detect_compression, path)
+
+    try:
+        if compression == "zstd":
+            await _run_command_to_file(
+                [*_zstd_decompress_command(), "-c", str(path)],
+                target,
+                progress=progress,
+            )
+        elif compression != "bzip2" and should_use_pigz(processes):
+            await _run_command_to_file(
+                ["pigz", "-p", str(processes), "-d", "--stdout", str(path)],
+                target,
+                progress=progress,
+            )
+        else:
+            await _run_in_thread(
+                _decompress_file_with_progress,
+                path,
+                target,
+                compression,
+                progress=progress,
+            )
+    except asyncio.CancelledError:
+        target.unlink(missing_ok=True)
+        raise
+
+
+async def decompress_tgz_async(
+    path: Path,
+    target: Path,
+    processes: int = 1,
+    progress: Callable[[int], None] | None = None,
+):
+    """Decompress the tar.gz file at ``path`` to the directory ``target`` without
+    blocking the event loop.
+
+    Members are extracted in a single streaming pass in a thread, as in
+    :func:`decompress_tgz`. If the task is cancelled, extraction stops after the
+    current member. Members that were already extracted are left in place.
+
+    :param path: the path to the tar.gz file.
+    :param target: the path to directory into which to decompress the tar.gz file.
+    :param processes: the number of processes available for decompression
+    :param progress: called with the total size of the members extracted so far
+
+    """
+    await _run_in_thread(
+        _decompress_tgz_with_progress,
+        path,
+        target,
+        processes,
+        progress=progress,
+    )
 
 
 def file_stats(path: Path) -> dict:
@@ -198,18 +915,119 @@ def rm(path: Path, recursive: bool = False) -> bool:
         raise
 
 
-def is_gzipped(path: Path) -> bool:
-    """:param path: path of the file to check
-    :return: True if the file is gzipped, else False
+def detect_compression(path: Path) -> str | None:
+    """Detect the compression format of the file at `path` from its magic bytes.
+
+    :param path: path of the file to check
+    :return: one of ``gzip``, ``bzip2``, or ``zstd``, or ``None`` if the file is not
+             compressed in a supported format
+
+    """
+    with open(path, "rb") as f:
+        head = f.read(4)
+
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+@contextmanager
+def _open_command_stdout(command: list[str]) -> Iterator[IO[bytes]]:
+    """Run ``command`` and yield a binary stream of its standard output.
+
+    If the stream was read to the end, a non-zero exit status raises
+    :class:`subprocess.CalledProcessError` when the context exits.
+
+    :param command: the command to run
+    :return: the standard output of the process
+
     """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+
     try:
+        yield process.stdout
+        finished = not process.stdout.read(1)
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    if finished and returncode:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+@contextmanager
+def open_decompressed(path: Path, processes: int = 1) -> Iterator[IO[bytes]]:
+    """Open the file at `path` for binary reading, decompressing it as it is read.
+
+    The compression format is detected using :func:`detect_compression`.
+    Uncompressed files are opened as-is. gzip-compressed files are decompressed with
+    pigz when :func:`should_use_pigz` allows it. zstd-compressed files require the
+    ``zstd`` binary.
+
+    .. code-block:: python
+
+        with open_decompressed(Path("reads.fq.gz"), processes=4) as f:
+            head = f.read(1024)
+
+    :param path: the path to the file
+    :param processes: the number of processes available for decompression
+    :return: a binary file object yielding the decompressed content
+
+    """
+    compression = detect_compression(path)
+
+    if compression == "gzip" and should_use_pigz(processes):
+        with _open_command_stdout(
+            ["pigz", "-p", str(processes), "-d", "-c", str(path)],
+        ) as f:
+            yield f
+
+    elif compression == "gzip":
         with gzip.open(path, "rb") as f:
-            f.peek(1)
-    except OSError as err:
-        if "Not a gzipped file" in str(err):
-            return False
+            yield f
+
+    elif compression == "bzip2":
+        with bz2.open(path, "rb") as f:
+            yield f
+
+    elif compression == "zstd":
+        if not shutil.which("zstd"):
+            raise OSError("The zstd binary is required to read zstd-compressed files")
+
+        with _open_command_stdout(["zstd", "-d", "-c", "-q", str(path)]) as f:
+            yield f
 
-    return True
+    else:
+        with open(path, "rb") as f:
+            yield f
+
+
+def strip_compression_suffix(path: Path) -> Path:
+    """Remove a compression suffix like ``.gz`` from `path` if it has one.
+
+    :param path: the path to strip
+    :return: the path without a compression suffix
+
+    """
+    path = Path(path)
+
+    if path.suffix in COMPRESSION_SUFFIXES:
+        return path.with_suffix("")
+
+    return path
+
+
+def is_gzipped(path: Path) -> bool:
+    """Check whether the file at `path` is gzipped.
+
+    Use :func:`detect_compression` to handle other formats as well.
+
+    :param path: path of the file to check
+    :return: True if the file is gzipped, else False
+    """
+    return detect_compression(path) == "gzip"
 
 
 def timestamp() -> datetime.datetime: